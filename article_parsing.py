@@ -0,0 +1,297 @@
+"""
+URL and title detection for article imports.
+Turns uploaded files and Google Sheets DataFrames into the list of
+{'URL', 'Title'} dicts that DatabaseManager.add_articles expects.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# URL pattern - matches http://, https://, www., and common domains
+URL_PATTERN = re.compile(r'https?://[^\s]+|www\.[^\s]+|[a-zA-Z0-9-]+\.(?:com|org|net|edu|gov|io|co|ai|app|dev)[^\s]*')
+
+# Header names recognized before falling back to scanning the data (case-insensitive)
+URL_COLUMN_NAMES = ['url', 'link', 'source', 'article', 'webpage', 'site']
+TITLE_COLUMN_NAMES = ['title', 'headline', 'name', 'article title', 'description']
+
+# Rows per DataFrame when parsing uploads incrementally
+PARSE_CHUNK_ROWS = 10000
+
+UPLOAD_EXTENSIONS = ('.txt', '.csv', '.xlsx', '.xls')
+
+
+def is_url(text):
+    """Smart URL detection using regex"""
+    if not isinstance(text, str):
+        return False
+    return bool(URL_PATTERN.search(text.strip()))
+
+
+def extract_url_and_title(row_data):
+    """Extract URL and title from a row of data (list or dict)"""
+    url = None
+    title = None
+
+    if isinstance(row_data, dict):
+        # Dictionary - check all values for URLs
+        values = list(row_data.values())
+    else:
+        # List or tuple
+        values = list(row_data)
+
+    # Find first URL
+    for val in values:
+        if is_url(val):
+            url = str(val).strip()
+            # Ensure URL has protocol
+            if not url.startswith('http'):
+                url = 'https://' + url
+            break
+
+    # Find title (first non-URL text value, or use URL)
+    for val in values:
+        if val and not is_url(val) and isinstance(val, str) and len(val.strip()) > 0:
+            title = str(val).strip()
+            break
+
+    if not title and url:
+        title = url[:50] + '...' if len(url) > 50 else url
+
+    return url, title
+
+
+def parse_txt_line(line):
+    """
+    Parse one line of a .txt upload - automatically detects URLs
+
+    Returns:
+        {'URL', 'Title'} dict, or None for blank, comment and URL-less lines
+    """
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+
+    # Try comma-separated format first
+    if ',' in line:
+        parts = [p.strip() for p in line.split(',')]
+        url, title = extract_url_and_title(parts)
+    else:
+        # Single value - check if it's a URL
+        url, title = extract_url_and_title([line])
+
+    return {'URL': url, 'Title': title} if url else None
+
+
+def detect_columns(df):
+    """
+    Pick the URL and title columns of a DataFrame
+
+    Returns:
+        Tuple of (url_col, title_col); either may be None
+    """
+    url_col = None
+    title_col = None
+
+    # Try to find columns by common names first
+    for col in df.columns:
+        if str(col).lower().strip() in URL_COLUMN_NAMES:
+            url_col = col
+            break
+
+    for col in df.columns:
+        if str(col).lower().strip() in TITLE_COLUMN_NAMES:
+            title_col = col
+            break
+
+    # If no obvious columns found, scan data to find URLs
+    if not url_col:
+        for col in df.columns:
+            # Check first few non-null values
+            sample_values = df[col].dropna().head(5)
+            if any(is_url(str(val)) for val in sample_values):
+                url_col = col
+                break
+
+    return url_col, title_col
+
+
+def _stripped_strings(values):
+    """
+    Convert a column of cell values to stripped strings
+
+    Returns:
+        Tuple of (object Series of stripped str(value), boolean notna mask);
+        missing cells are '' in the Series
+    """
+    present = pd.notna(values)
+    strings = np.full(len(values), '', dtype=object)
+    # str() per cell, exactly as row-wise code would format it
+    strings[present] = [str(v) for v in values[present]]
+    return pd.Series(strings, dtype=object).str.strip(), present
+
+
+def smart_parse_dataframe(df, columns=None):
+    """
+    Smart parsing of dataframe - automatically detects URL and Title columns
+
+    Works column-wise: each candidate column is converted and regex-matched
+    as a whole, instead of visiting every cell of every row in Python.
+    Cell values are read from df.values, the same row-wise view (and dtype
+    upcasting) iterrows uses, so the output is identical.
+
+    Args:
+        df: DataFrame to parse
+        columns: (url_col, title_col) from detect_columns, to keep the
+                 choice fixed across the chunks of one upload; detected
+                 from df when omitted
+
+    Returns:
+        List of {'URL', 'Title'} dicts, in row order
+    """
+    url_col, title_col = columns or detect_columns(df)
+
+    if not url_col:
+        return []  # No URLs found
+
+    columns = list(df.columns)
+    values = df.values
+
+    urls, url_present = _stripped_strings(values[:, columns.index(url_col)])
+    keep = (url_present & urls.str.contains(URL_PATTERN)).to_numpy()
+    if not keep.any():
+        return []
+
+    values = values[keep]
+    urls = urls[keep].reset_index(drop=True)
+
+    # Ensure URL has protocol
+    urls = urls.where(urls.str.startswith('http'), 'https://' + urls)
+
+    titles = np.full(len(urls), None, dtype=object)
+    needs_title = np.ones(len(urls), dtype=bool)
+
+    if title_col:
+        candidates, present = _stripped_strings(values[:, columns.index(title_col)])
+        titles[present] = candidates[present].to_numpy()
+        needs_title &= ~present
+
+    # Fallback: first non-URL, non-empty value in any other column, left to
+    # right, looking only at the rows still without a title
+    for i, col in enumerate(columns):
+        pending = np.flatnonzero(needs_title)
+        if not len(pending):
+            break
+        if col == url_col:
+            continue
+        candidates, present = _stripped_strings(values[pending, i])
+        usable = present & (candidates.str.len() > 0).to_numpy() & ~candidates.str.contains(URL_PATTERN).to_numpy()
+        titles[pending[usable]] = candidates[usable].to_numpy()
+        needs_title[pending[usable]] = False
+
+    # Last resort: the (possibly shortened) URL itself
+    if needs_title.any():
+        short = urls.where(urls.str.len() <= 50, urls.str[:50] + '...')
+        titles[needs_title] = short[needs_title].to_numpy()
+
+    return [{'URL': url, 'Title': title} for url, title in zip(urls.tolist(), titles.tolist())]
+
+
+def _iter_dataframe_articles(frames):
+    """
+    Parse a sequence of DataFrame chunks with one column choice
+
+    The URL/title columns are detected on the first chunk and reused, so
+    every chunk is read the same way.
+
+    Yields:
+        Tuples of (rows in the chunk, list of {'URL', 'Title'} dicts)
+
+    Raises:
+        ValueError: If the first chunk has no URL column
+    """
+    columns = None
+    for df in frames:
+        if columns is None:
+            columns = detect_columns(df)
+            if not columns[0]:
+                raise ValueError('No URLs detected in file. Please ensure file contains valid URLs.')
+        yield len(df), smart_parse_dataframe(df, columns)
+
+
+def _iter_xlsx_frames(path, chunk_rows):
+    """Read the first sheet of an .xlsx workbook as DataFrame chunks, streaming its rows"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [f'Unnamed: {i}' if name is None else name for i, name in enumerate(header)]
+
+        chunk = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue  # Blank line
+            chunk.append(row[:len(header)])
+            if len(chunk) >= chunk_rows:
+                yield pd.DataFrame(chunk, columns=header, dtype=object)
+                chunk = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=header, dtype=object)
+    finally:
+        workbook.close()
+
+
+def _iter_txt_articles(path, chunk_rows):
+    """Parse a .txt upload line by line, in chunks"""
+    chunk = []
+    lines = 0
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            lines += 1
+            article = parse_txt_line(line)
+            if article:
+                chunk.append(article)
+            if lines >= chunk_rows:
+                yield lines, chunk
+                chunk = []
+                lines = 0
+    if lines:
+        yield lines, chunk
+
+
+def iter_upload_articles(filename, path, chunk_rows=PARSE_CHUNK_ROWS):
+    """
+    Parse an uploaded file incrementally
+
+    Only one chunk of rows is turned into a DataFrame at a time. CSV cells
+    are read as text so every chunk sees the same values whatever the
+    column's other rows contain. .xls workbooks can't be streamed and are
+    read whole.
+
+    Args:
+        filename: Upload filename; its extension picks the parser
+        path: Path of the spooled upload
+        chunk_rows: Rows per chunk
+
+    Yields:
+        Tuples of (rows read, list of {'URL', 'Title'} dicts found in them)
+
+    Raises:
+        ValueError: For unsupported file types or files without a URL column
+    """
+    if filename.endswith('.txt'):
+        yield from _iter_txt_articles(path, chunk_rows)
+    elif filename.endswith('.csv'):
+        with pd.read_csv(path, dtype=str, chunksize=chunk_rows) as reader:
+            yield from _iter_dataframe_articles(reader)
+    elif filename.endswith('.xlsx'):
+        yield from _iter_dataframe_articles(_iter_xlsx_frames(path, chunk_rows))
+    elif filename.endswith('.xls'):
+        yield from _iter_dataframe_articles([pd.read_excel(path)])
+    else:
+        raise ValueError('Unsupported file format. Use .csv, .xlsx, .xls, or .txt')
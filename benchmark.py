@@ -0,0 +1,423 @@
+"""
+Performance benchmarks for the article scoring database layer.
+Each benchmark builds a throwaway SQLite database, seeds it with synthetic
+articles and scores, and reports wall time and SQL statement counts.
+
+Usage:
+    python benchmark.py scores --articles 10000 --scores-per-article 3
+    python benchmark.py sqlite-concurrency --workers 2 --threads 4 --seconds 10
+    python benchmark.py url-hash --articles 1000000
+    python benchmark.py coalesce --articles 10000 --requests 100
+    python benchmark.py parse --max-rows 1000000
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+
+import pandas as pd
+from sqlalchemy import event, text
+
+from database import DatabaseManager, Article, Score, SCORE_CATEGORIES, url_hash
+from single_flight import SingleFlight
+from article_parsing import is_url, smart_parse_dataframe, detect_columns
+
+
+class QueryCounter:
+    """Count SQL statements executed on an engine while active"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+
+
+def make_temp_db(**kwargs):
+    """Create a DatabaseManager backed by a fresh temporary SQLite file"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    return DatabaseManager(f'sqlite:///{path}', **kwargs), path
+
+
+def remove_db_files(path):
+    """Remove a SQLite database along with its WAL and shared-memory files"""
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def article_url(i, path=''):
+    return f'https://example.com/{path}article/{i}'
+
+
+def seed(db, n_articles, scores_per_article, path=''):
+    """Bulk insert synthetic articles and scores"""
+    rng = random.Random(42)
+    session = db.get_session()
+    try:
+        for start in range(1, n_articles + 1, 50000):
+            session.bulk_insert_mappings(Article, [
+                {'id': i, 'url': article_url(i, path), 'title': f'Article {i}'}
+                for i in range(start, min(start + 50000, n_articles + 1))
+            ])
+        session.bulk_insert_mappings(Score, [
+            dict({cat: rng.randint(1, 10) for cat in SCORE_CATEGORIES},
+                 article_id=i, notes='benchmark')
+            for i in range(1, n_articles + 1)
+            for _ in range(scores_per_article)
+        ])
+        session.commit()
+    finally:
+        session.close()
+
+
+def legacy_get_all_scores(db):
+    """The original lazy-loading implementation, kept for comparison"""
+    session = db.get_session()
+    try:
+        scores_data = {}
+        for article in session.query(Article).all():
+            if article.scores:
+                scores_data[article.url] = [score.to_dict() for score in article.scores]
+        return scores_data
+    finally:
+        session.close()
+
+
+def timed(db, func, *args):
+    """Run func, returning (result, seconds, statement count)"""
+    with QueryCounter(db.engine) as counter:
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+    return result, elapsed, counter.count
+
+
+def report(label, elapsed, queries):
+    print(f"  {label:32s} {elapsed * 1000:10.1f} ms {queries:8d} queries")
+
+
+def bench_scores(args):
+    """Compare the N+1 get_all_scores with the single joined query"""
+    db, path = make_temp_db()
+    try:
+        seed(db, args.articles, args.scores_per_article)
+        print(f"get_all_scores: {args.articles} articles x {args.scores_per_article} scores")
+
+        legacy, elapsed, queries = timed(db, legacy_get_all_scores, db)
+        report('legacy (lazy relationship)', elapsed, queries)
+
+        current, elapsed, queries = timed(db, db.get_all_scores)
+        report('joined query', elapsed, queries)
+
+        assert legacy == current, 'result shape changed'
+
+        url = f'https://example.com/article/{args.articles // 2}'
+        _, elapsed, queries = timed(db, db.get_scores_for_article, url)
+        report('get_scores_for_article', elapsed, queries)
+    finally:
+        db.engine.dispose()
+        remove_db_files(path)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def concurrency_worker(path, sqlite_profile, n_articles, threads, seconds, results):
+    """One 'gunicorn worker': several threads mixing score writes and reads"""
+    db = DatabaseManager(f'sqlite:///{path}', sqlite_profile=sqlite_profile)
+    score = {cat: 5 for cat in SCORE_CATEGORIES}
+    lock = threading.Lock()
+    stats = {'writes': 0, 'reads': 0, 'locked': 0, 'write_latency': []}
+    deadline = time.monotonic() + seconds
+
+    def run(seed_value):
+        rng = random.Random(seed_value)
+        while time.monotonic() < deadline:
+            url = f'https://example.com/article/{rng.randint(1, n_articles)}'
+            write = rng.random() < 0.3
+            start = time.perf_counter()
+            try:
+                if write:
+                    db.add_score(url, score)
+                else:
+                    db.get_scores_for_article(url)
+            except Exception as e:
+                if 'locked' not in str(e):
+                    raise
+                with lock:
+                    stats['locked'] += 1
+                continue
+            elapsed = time.perf_counter() - start
+            with lock:
+                if write:
+                    stats['writes'] += 1
+                    stats['write_latency'].append(elapsed)
+                else:
+                    stats['reads'] += 1
+
+    workers = [threading.Thread(target=run, args=(os.getpid() * 100 + i,)) for i in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    db.engine.dispose()
+    results.put(stats)
+
+
+def bench_sqlite_concurrency(args):
+    """Compare default SQLite settings with the production profile under multi-process load"""
+    print(f"SQLite concurrency: {args.workers} processes x {args.threads} threads, "
+          f"{args.seconds}s, 30% writes")
+    ctx = multiprocessing.get_context('fork')
+
+    for label, sqlite_profile in (('defaults (rollback journal)', False), ('production profile (WAL)', True)):
+        db, path = make_temp_db(sqlite_profile=sqlite_profile)
+        try:
+            seed(db, args.articles, 1)
+            db.engine.dispose()
+
+            results = ctx.Queue()
+            procs = [
+                ctx.Process(target=concurrency_worker,
+                            args=(path, sqlite_profile, args.articles, args.threads, args.seconds, results))
+                for _ in range(args.workers)
+            ]
+            for p in procs:
+                p.start()
+            totals = [results.get() for _ in procs]
+            for p in procs:
+                p.join()
+
+            writes = sum(t['writes'] for t in totals)
+            reads = sum(t['reads'] for t in totals)
+            locked = sum(t['locked'] for t in totals)
+            latency = [x for t in totals for x in t['write_latency']]
+            print(f"  {label:30s} {writes / args.seconds:8.1f} writes/s {reads / args.seconds:9.1f} reads/s "
+                  f"{locked:5d} locked errors  write p50 {percentile(latency, 50) * 1000:6.1f} ms "
+                  f"p95 {percentile(latency, 95) * 1000:7.1f} ms")
+        finally:
+            remove_db_files(path)
+
+
+def sqlite_used_bytes(conn):
+    """Bytes in use by a SQLite database, excluding free pages"""
+    page_size = conn.execute(text('PRAGMA page_size')).scalar()
+    pages = conn.execute(text('PRAGMA page_count')).scalar()
+    free = conn.execute(text('PRAGMA freelist_count')).scalar()
+    return (pages - free) * page_size
+
+
+def bench_url_hash(args):
+    """Compare index size and point-lookup latency of the full-URL vs url_hash indexes"""
+    # Typical news URL length: long slug plus tracking-free query
+    path = 'news/2025/01/15/' + 'an-article-slug-with-many-descriptive-words-' * 3
+    db, path_db = make_temp_db()
+    try:
+        seed(db, args.articles, 0, path)
+        print(f"URL index vs url_hash index: {args.articles} articles, "
+              f"~{len(article_url(args.articles, path))} char URLs")
+
+        rng = random.Random(7)
+        urls = [article_url(rng.randint(1, args.articles), path) for _ in range(args.lookups)]
+
+        with db.engine.connect() as conn:
+            sizes = {}
+            before = sqlite_used_bytes(conn)
+            conn.execute(text('CREATE UNIQUE INDEX bench_ix_url ON articles (url)'))
+            sizes['url'] = sqlite_used_bytes(conn) - before
+
+            conn.execute(text('DROP INDEX ix_articles_url_hash'))
+            before = sqlite_used_bytes(conn)
+            conn.execute(text('CREATE UNIQUE INDEX ix_articles_url_hash ON articles (url_hash)'))
+            sizes['url_hash'] = sqlite_used_bytes(conn) - before
+            conn.commit()
+
+            for label, column, key in (('url (String(2048))', 'url', lambda u: u),
+                                       ('url_hash (String(32))', 'url_hash', url_hash)):
+                statement = text(f'SELECT id FROM articles WHERE {column} = :key')
+                start = time.perf_counter()
+                for url in urls:
+                    assert conn.execute(statement, {'key': key(url)}).scalar() is not None
+                elapsed = time.perf_counter() - start
+                print(f"  {label:24s} index {sizes[column] / 1024 / 1024:8.1f} MiB   "
+                      f"lookup {elapsed / len(urls) * 1e6:7.1f} us")
+    finally:
+        db.engine.dispose()
+        remove_db_files(path_db)
+
+
+def burst(func, n):
+    """Call func from n threads released at the same instant; returns (results, latencies)"""
+    barrier = threading.Barrier(n)
+    results = [None] * n
+    latencies = [0.0] * n
+
+    def run(i):
+        barrier.wait()
+        start = time.perf_counter()
+        results[i] = func()
+        latencies[i] = time.perf_counter() - start
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, latencies
+
+
+def bench_coalesce(args):
+    """Compare a burst of concurrent get_all_scores calls with and without single-flight"""
+    # One pooled connection per caller, as if each were its own request thread
+    db, path = make_temp_db(pool_size=args.requests)
+    try:
+        seed(db, args.articles, args.scores_per_article)
+        expected = db.get_all_scores()
+        print(f"Burst of {args.requests} concurrent get_all_scores: "
+              f"{args.articles} articles x {args.scores_per_article} scores")
+
+        for label, single_flight in (('independent', None), ('single-flight', SingleFlight())):
+            db.single_flight = single_flight
+            with QueryCounter(db.engine) as counter:
+                start = time.perf_counter()
+                results, latencies = burst(db.get_all_scores, args.requests)
+                elapsed = time.perf_counter() - start
+
+            assert all(result == expected for result in results), 'result changed'
+            # With single-flight every caller also reads the data version
+            # (one primary-key lookup) to key the shared computation
+            report(label, elapsed, counter.count)
+            print(f"  {'':32s} p50 {percentile(latencies, 50) * 1000:8.1f} ms "
+                  f"p95 {percentile(latencies, 95) * 1000:8.1f} ms")
+            if single_flight:
+                print(f"  {'':32s} {single_flight.get_metrics()}")
+    finally:
+        db.engine.dispose()
+        remove_db_files(path)
+
+
+def make_upload_frame(n_rows):
+    """Synthetic spreadsheet: mixed URL forms, some missing headlines, extra columns"""
+    rng = random.Random(3)
+    links, headlines = [], []
+    for i in range(n_rows):
+        r = rng.random()
+        if r < 0.7:
+            links.append(f'https://example.com/news/{i}')
+        elif r < 0.98:
+            links.append(f'  example.org/story/{i} ')
+        else:
+            links.append('n/a')
+        headlines.append(None if rng.random() < 0.1 else f'Headline {i}')
+    return pd.DataFrame({
+        'Link': links,
+        'Headline': headlines,
+        'Notes': [None if i % 3 else f'note {i}' for i in range(n_rows)],
+        'Rating': [i % 10 for i in range(n_rows)],
+    })
+
+
+def legacy_smart_parse_dataframe(df):
+    """The original iterrows implementation, kept for comparison"""
+    articles = []
+    url_col, title_col = detect_columns(df)
+    if not url_col:
+        return []
+
+    for idx, row in df.iterrows():
+        url = str(row[url_col]).strip() if pd.notna(row[url_col]) else None
+
+        if url and is_url(url):
+            if not url.startswith('http'):
+                url = 'https://' + url
+
+            if title_col and pd.notna(row[title_col]):
+                title = str(row[title_col]).strip()
+            else:
+                title = None
+                for col in df.columns:
+                    if col != url_col and pd.notna(row[col]):
+                        val = str(row[col]).strip()
+                        if not is_url(val) and len(val) > 0:
+                            title = val
+                            break
+
+                if not title:
+                    title = url[:50] + '...' if len(url) > 50 else url
+
+            articles.append({'URL': url, 'Title': title})
+
+    return articles
+
+
+def bench_parse(args):
+    """Compare the iterrows smart_parse_dataframe with the column-wise one, 10^3 rows upward"""
+    print(f"smart_parse_dataframe (legacy run up to {args.legacy_max_rows} rows)")
+    n_rows = 1000
+    while n_rows <= args.max_rows:
+        df = make_upload_frame(n_rows)
+
+        start = time.perf_counter()
+        current = smart_parse_dataframe(df)
+        elapsed = time.perf_counter() - start
+        line = f"  {n_rows:>9d} rows  column-wise {elapsed * 1000:10.1f} ms"
+
+        if n_rows <= args.legacy_max_rows:
+            start = time.perf_counter()
+            legacy = legacy_smart_parse_dataframe(df)
+            legacy_elapsed = time.perf_counter() - start
+            assert legacy == current, 'output changed'
+            line += f"  iterrows {legacy_elapsed * 1000:10.1f} ms  ({legacy_elapsed / elapsed:5.1f}x)"
+
+        print(line)
+        n_rows *= 10
+
+
+BENCHMARKS = {
+    'scores': bench_scores,
+    'sqlite-concurrency': bench_sqlite_concurrency,
+    'url-hash': bench_url_hash,
+    'coalesce': bench_coalesce,
+    'parse': bench_parse,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Database layer benchmarks')
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('--articles', type=int, default=10000)
+    parser.add_argument('--scores-per-article', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--lookups', type=int, default=20000)
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--max-rows', type=int, default=1000000)
+    parser.add_argument('--legacy-max-rows', type=int, default=100000)
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == '__main__':
+    main()
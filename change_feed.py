@@ -0,0 +1,305 @@
+"""
+Live update feed for server-sent events.
+Writes record compact change events in the change_events table; one poller
+thread per worker process reads new events and fans them out to that
+worker's connected SSE clients, so every gunicorn worker's listeners see
+every worker's writes.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger('change_feed')
+
+# Seconds between prunes of expired events
+PRUNE_INTERVAL = 60
+
+# Minimum seconds between logged poller failures
+ERROR_LOG_INTERVAL = 60
+
+
+class Subscription:
+    """One SSE client's queue of pending events"""
+
+    def __init__(self, max_queued):
+        self.queue = queue.Queue(maxsize=max_queued)
+        # Set when the client fell too far behind and events were dropped
+        self.overflowed = False
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+
+class ChangeFeed:
+    """Poll the change_events table and fan new events out to local subscribers"""
+
+    def __init__(self, db, poll_interval=1.0, max_clients=10, retention_seconds=3600,
+                 max_queued=1000, batch_size=500):
+        """
+        Initialize the feed
+
+        Args:
+            db: DatabaseManager whose writes record change events
+            poll_interval: Seconds between checks for new events while
+                           anyone is subscribed
+            max_clients: Concurrent SSE clients per worker process; each
+                         one holds a request thread for as long as it is
+                         connected, so keep it below the worker's threads
+            retention_seconds: Age after which events are pruned; clients
+                               reconnecting after longer reload instead
+            max_queued: Events buffered per client before it is told to
+                        reload instead
+            batch_size: Events read per query
+        """
+        self.db = db
+        self.poll_interval = poll_interval
+        self.max_clients = max_clients
+        self.retention_seconds = retention_seconds
+        self.max_queued = max_queued
+        self.batch_size = batch_size
+
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._thread = None
+        self._pid = None
+        self._last_id = 0
+        self._last_version = None
+        self._last_prune = 0
+        self._last_error_log = None
+        self._suppressed_errors = 0
+        self._metrics = {
+            'polls': 0,
+            'events': 0,
+            'deliveries': 0,
+            'overflows': 0,
+            'rejected': 0,
+            'errors': 0
+        }
+
+    def attach(self, db):
+        """
+        Make a DatabaseManager record change events for this feed
+
+        The DatabaseManager starts the poller on its first recorded change,
+        so events are pruned on schedule even while nobody is subscribed.
+        """
+        db.change_feed = self
+
+    def subscribe(self):
+        """
+        Register a client
+
+        Returns:
+            Tuple of (Subscription, ID of the last event already dispatched),
+            or None when max_clients are already connected to this worker
+        """
+        self.start()
+        with self._lock:
+            if len(self._subscribers) >= self.max_clients:
+                self._metrics['rejected'] += 1
+                return None
+            if not self._subscribers:
+                # Nothing was polled while nobody listened; start from now
+                # instead of replaying everything since the last subscriber
+                self._last_id = self.db.get_latest_change_id()
+                self._last_version = self.db.get_data_version()
+            subscription = Subscription(self.max_queued)
+            self._subscribers.add(subscription)
+            return subscription, self._last_id
+
+    def unsubscribe(self, subscription):
+        """Remove a client registered with subscribe()"""
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def start(self):
+        """Start the poller thread, restarting it in a forked child"""
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            # Threads don't survive fork(); a child needs its own poller
+            self._pid = os.getpid()
+            self._subscribers = set()
+            self._thread = threading.Thread(target=self._poll_loop, name='change-feed', daemon=True)
+            self._thread.start()
+
+    def _poll_loop(self):
+        """Dispatch new events to subscribers, and prune old ones, until the process exits"""
+        while True:
+            time.sleep(self.poll_interval)
+            with self._lock:
+                idle = not self._subscribers
+            try:
+                if not idle:
+                    self.poll()
+                if time.monotonic() - self._last_prune > PRUNE_INTERVAL:
+                    self._last_prune = time.monotonic()
+                    self.db.prune_change_events(self.retention_seconds)
+            except Exception:
+                # A failed poll or prune is retried on the next tick
+                self._log_poll_error()
+
+    def _log_poll_error(self):
+        """Log the current poller exception, at most once per ERROR_LOG_INTERVAL"""
+        with self._lock:
+            self._metrics['errors'] += 1
+        now = time.monotonic()
+        if self._last_error_log is not None and now - self._last_error_log < ERROR_LOG_INTERVAL:
+            self._suppressed_errors += 1
+            return
+        suppressed = f' ({self._suppressed_errors} earlier failures not logged)' if self._suppressed_errors else ''
+        logger.warning('Change feed poll failed, retrying%s', suppressed, exc_info=True)
+        self._last_error_log = now
+        self._suppressed_errors = 0
+
+    def poll(self):
+        """
+        Read and dispatch events committed since the last poll
+
+        The single-row data version is checked first, so a poll with nothing
+        new costs one primary-key read.
+        """
+        with self._lock:
+            self._metrics['polls'] += 1
+
+        version = self.db.get_data_version()
+        if version != self._last_version:
+            while True:
+                events = self.db.get_change_events(self._last_id, self.batch_size)
+                if events:
+                    self._dispatch(events)
+                if len(events) < self.batch_size:
+                    break
+            self._last_version = version
+
+    def _dispatch(self, events):
+        """Queue events for every subscriber and advance the feed position"""
+        with self._lock:
+            for subscription in self._subscribers:
+                was_overflowed = subscription.overflowed
+                for event in events:
+                    subscription.put(event)
+                if subscription.overflowed and not was_overflowed:
+                    self._metrics['overflows'] += 1
+            # A subscribe() that reset the position meanwhile may be ahead
+            self._last_id = max(self._last_id, events[-1]['id'])
+            self._metrics['events'] += len(events)
+            self._metrics['deliveries'] += len(events) * len(self._subscribers)
+
+    def stream(self, subscription, last_seen_id, resume_from=None, heartbeat=15, max_seconds=300):
+        """
+        Generate an SSE stream for a subscription
+
+        Ends after max_seconds so a request thread is never held for good;
+        browsers reconnect on their own, sending Last-Event-ID, and resume
+        where they left off.
+
+        Args:
+            subscription: Subscription from subscribe()
+            last_seen_id: Feed position returned by subscribe()
+            resume_from: Last-Event-ID sent by a reconnecting client, or None
+            heartbeat: Seconds between keep-alive comments
+            max_seconds: Stream lifetime
+
+        Yields:
+            SSE-formatted strings
+        """
+        try:
+            yield 'retry: 3000\n\n'
+            sent_id = last_seen_id
+
+            if resume_from is not None and resume_from < last_seen_id:
+                # Replay what the client missed while disconnected, starting
+                # from the last event it saw. If that event has been pruned
+                # or the gap is over one batch, it reloads instead.
+                backlog = self.db.get_change_events(resume_from - 1, self.batch_size + 1)
+                if not backlog or backlog[0]['id'] != resume_from or len(backlog) > self.batch_size:
+                    yield format_event({'id': last_seen_id, 'kind': 'resync', 'data': {}})
+                else:
+                    for event in backlog[1:]:
+                        if event['id'] <= last_seen_id:
+                            yield format_event(event)
+            elif resume_from is not None:
+                # Reconnected to a worker whose poller hasn't caught up yet
+                sent_id = resume_from
+
+            deadline = time.monotonic() + max_seconds
+            while time.monotonic() < deadline:
+                try:
+                    event = subscription.queue.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+
+                if subscription.overflowed:
+                    # Events were dropped; have the client reload everything
+                    subscription.overflowed = False
+                    with subscription.queue.mutex:
+                        subscription.queue.queue.clear()
+                    sent_id = max(sent_id, event['id'])
+                    yield format_event({'id': sent_id, 'kind': 'resync', 'data': {}})
+                    continue
+
+                if event['id'] > sent_id:
+                    sent_id = event['id']
+                    yield format_event(event)
+        finally:
+            self.unsubscribe(subscription)
+
+    def get_metrics(self):
+        """Get feed counters for this process"""
+        with self._lock:
+            m = dict(self._metrics)
+            m['clients'] = len(self._subscribers)
+            m['max_clients'] = self.max_clients
+            m['last_event_id'] = self._last_id
+        return m
+
+
+def format_event(event):
+    """Render a change event dict as an SSE message"""
+    return f"id: {event['id']}\nevent: {event['kind']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+def create_change_feed(db):
+    """
+    Factory function to attach a ChangeFeed to a DatabaseManager from environment settings
+
+    Live updates are off unless LIVE_UPDATES is set to 1/true. Every SSE
+    client holds a request thread, so under gunicorn
+    LIVE_UPDATES_MAX_CLIENTS (default 10 per worker) is capped at one below
+    GUNICORN_THREADS, and live updates stay off with a single thread per
+    worker; pages then pick up changes by polling instead.
+    LIVE_UPDATES_POLL_SECONDS sets how often each worker checks for new
+    events and LIVE_UPDATES_RETENTION_SECONDS how long they are kept.
+
+    Returns:
+        ChangeFeed instance, or None when disabled
+    """
+    if os.environ.get('LIVE_UPDATES', '').lower() not in ('1', 'true', 'yes'):
+        return None
+
+    max_clients = int(os.environ.get('LIVE_UPDATES_MAX_CLIENTS', 10))
+    threads = os.environ.get('GUNICORN_THREADS')
+    if threads is not None:
+        # Keep a thread per worker free for ordinary requests
+        max_clients = min(max_clients, int(threads) - 1)
+        if max_clients < 1:
+            logger.warning('LIVE_UPDATES needs GUNICORN_THREADS of 2 or more; live updates are off')
+            return None
+
+    feed = ChangeFeed(
+        db,
+        poll_interval=float(os.environ.get('LIVE_UPDATES_POLL_SECONDS', 1)),
+        max_clients=max_clients,
+        retention_seconds=int(os.environ.get('LIVE_UPDATES_RETENTION_SECONDS', 3600))
+    )
+    feed.attach(db)
+    return feed
@@ -0,0 +1,199 @@
+"""
+Response compression for the Flask app.
+Compresses JSON and text responses above a size threshold with the best
+encoding the client accepts (brotli when the brotli package is installed,
+otherwise gzip), and keeps precompressed copies of static files next to
+the originals for static_assets to serve.
+"""
+
+import gzip
+import os
+import threading
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Mimetypes worth compressing; images and archives are already compressed
+COMPRESSIBLE_MIMETYPES = (
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/javascript',
+    'text/csv',
+    'image/svg+xml'
+)
+
+# Static file extensions precompressed at startup
+PRECOMPRESS_EXTENSIONS = ('.js', '.css', '.html', '.svg', '.json', '.txt')
+
+# Suffix of the precompressed copy for each encoding
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+class Compressor:
+    """Negotiate and apply Content-Encoding for one Flask app"""
+
+    def __init__(self, min_size=1024, level=6, brotli_quality=5):
+        """
+        Initialize the compressor
+
+        Args:
+            min_size: Smallest body, in bytes, that is compressed; below it
+                      the headers outweigh the savings
+            level: gzip compression level (1-9)
+            brotli_quality: brotli quality (0-11)
+        """
+        self.min_size = min_size
+        self.level = level
+        self.brotli_quality = brotli_quality
+        self.encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+        self._lock = threading.Lock()
+        self._metrics = {
+            'compressed': 0,
+            'skipped_small': 0,
+            'bytes_in': 0,
+            'bytes_out': 0,
+            'static_precompressed': 0
+        }
+
+    def init_app(self, app):
+        """Compress the app's responses and precompress its static files"""
+        self.precompress_static(app.static_folder)
+        app.after_request(self.compress_response)
+
+    def negotiate(self):
+        """
+        Pick the encoding for the current request
+
+        Returns:
+            'br', 'gzip', or None when the client accepts neither
+        """
+        accepted = request.accept_encodings
+        for encoding in self.encodings:
+            if accepted[encoding]:
+                return encoding
+        return None
+
+    def compress(self, data, encoding, level=None, quality=None):
+        """Compress bytes with the given encoding"""
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_quality if quality is None else quality)
+        # mtime=0 keeps the output identical for identical input
+        return gzip.compress(data, compresslevel=self.level if level is None else level, mtime=0)
+
+    def compress_response(self, response):
+        """
+        after_request hook compressing eligible responses in place
+
+        Streamed and file responses (exports, static files) are left alone:
+        they either handle encoding themselves or would have to be buffered.
+        A strong ETag is weakened, since the compressed bytes differ from the
+        identity representation it was computed for.
+        """
+        if (response.status_code != 200
+                or response.direct_passthrough
+                or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        encoding = self.negotiate()
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size:
+            with self._lock:
+                self._metrics['skipped_small'] += 1
+            return response
+
+        compressed = self.compress(data, encoding)
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+        with self._lock:
+            self._metrics['compressed'] += 1
+            self._metrics['bytes_in'] += len(data)
+            self._metrics['bytes_out'] += len(compressed)
+        return response
+
+    def precompress_static(self, folder):
+        """
+        Write .gz (and .br) copies of text static files that lack a fresh one
+
+        Copies are compressed at the highest level once, instead of per
+        request, and written atomically so concurrently starting workers
+        never serve a partial file.
+        """
+        if not folder or not os.path.isdir(folder):
+            return
+
+        for root, _dirs, files in os.walk(folder):
+            for name in files:
+                if not name.endswith(PRECOMPRESS_EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                if os.path.getsize(path) < self.min_size:
+                    continue
+
+                data = None
+                for encoding in self.encodings:
+                    target = path + ENCODING_SUFFIXES[encoding]
+                    if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                        continue
+                    if data is None:
+                        with open(path, 'rb') as f:
+                            data = f.read()
+                    temp_path = f'{target}.{os.getpid()}.tmp'
+                    with open(temp_path, 'wb') as f:
+                        f.write(self.compress(data, encoding, level=9, quality=11))
+                    os.replace(temp_path, target)
+                    self._metrics['static_precompressed'] += 1
+
+    def get_metrics(self):
+        """Get compression counters for this process"""
+        with self._lock:
+            m = dict(self._metrics)
+
+        m['ratio'] = m['bytes_out'] / m['bytes_in'] if m['bytes_in'] else 0
+        m['encodings'] = list(self.encodings)
+        m['min_size'] = self.min_size
+        m['level'] = self.level
+        return m
+
+
+def create_compressor(app):
+    """
+    Factory function to install a Compressor on a Flask app from environment settings
+
+    Compression is on unless COMPRESS_RESPONSES is set to 0/false.
+    COMPRESS_MIN_BYTES sets the size threshold, COMPRESS_LEVEL the gzip
+    level and COMPRESS_BROTLI_QUALITY the brotli quality.
+
+    Returns:
+        Compressor instance, or None when disabled
+    """
+    if os.environ.get('COMPRESS_RESPONSES', '1').lower() in ('0', 'false', 'no'):
+        return None
+
+    compressor = Compressor(
+        min_size=int(os.environ.get('COMPRESS_MIN_BYTES', 1024)),
+        level=int(os.environ.get('COMPRESS_LEVEL', 6)),
+        brotli_quality=int(os.environ.get('COMPRESS_BROTLI_QUALITY', 5))
+    )
+    compressor.init_app(app)
+    return compressor
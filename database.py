@@ -3,29 +3,95 @@ Database models and connection management for the article scoring app.
 Uses SQLAlchemy ORM with PostgreSQL backend for persistent, multi-user storage.
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Text, Float, DateTime, ForeignKey, JSON
+from sqlalchemy import create_engine, event, Column, Integer, String, Text, Float, DateTime, Boolean, ForeignKey, JSON, Index, func, or_, and_, text, bindparam, exists
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship, scoped_session
-from sqlalchemy.pool import QueuePool
-from datetime import datetime
+from sqlalchemy.orm import Session, sessionmaker, relationship, scoped_session
+from sqlalchemy.pool import QueuePool, StaticPool
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy import inspect as sa_inspect
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit, urlunsplit
 import os
 import json
+import base64
+import functools
+import hashlib
+import logging
 
 Base = declarative_base()
 
+logger = logging.getLogger('database')
+
+# Scoring categories, in display order
+SCORE_CATEGORIES = ['accuracy', 'credibility', 'citation', 'reasoning', 'confidence']
+
+# SQLite production profile settings (overridable via environment)
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 64 * 1024))
+
+# Set by the gunicorn master once the schema exists, so workers skip create_all
+SCHEMA_READY_ENV = 'DB_SCHEMA_READY'
+
+# A running import job that hasn't recorded progress for this long is
+# reported as failed: the worker process running it has died or restarted
+IMPORT_STALE_SECONDS = int(os.environ.get('IMPORT_STALE_SECONDS', 600))
+
+# Page size limits for the keyset-paginated listing methods
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 2000
+
+# Largest import whose new articles are listed in its change event; bigger
+# ones only carry the count and listeners reload the list
+CHANGE_EVENT_MAX_ARTICLES = 100
+
+# Inclusive overall-average bounds for the export/filter score ranges
+SCORE_RANGES = {
+    '9-10': (9, 10),
+    '7-8': (7, 8),
+    '4-6': (4, 6),
+    '1-3': (1, 3)
+}
+
+
+def normalize_url(url):
+    """Normalize a URL for identity: trim whitespace, lowercase scheme and host"""
+    url = url.strip()
+    parts = urlsplit(url)
+    if parts.scheme and parts.netloc:
+        url = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, parts.fragment))
+    return url
+
+
+def url_hash(url):
+    """Fixed-width (32 hex chars, 128-bit) digest of the normalized URL, used as the lookup key"""
+    return hashlib.blake2b(normalize_url(url).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _default_url_hash(context):
+    return url_hash(context.get_current_parameters()['url'])
+
 
 class Article(Base):
     """Article model - stores URLs and titles"""
     __tablename__ = 'articles'
     
     id = Column(Integer, primary_key=True)
-    url = Column(String(2048), unique=True, nullable=False, index=True)
+    url = Column(String(2048), nullable=False)  # Full URL, kept for display
+    url_hash = Column(String(32), nullable=False, unique=True, index=True, default=_default_url_hash)
     title = Column(String(512), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationship to scores
     scores = relationship('Score', back_populates='article', cascade='all, delete-orphan')
     
+    __table_args__ = (
+        # Supports keyset pagination ordered by (created_at, id)
+        Index('ix_articles_created_at_id', 'created_at', 'id'),
+    )
+    
     def to_dict(self):
         return {
             'URL': self.url,
@@ -65,16 +131,216 @@ class Score(Base):
         }
 
 
+class ArticleStats(Base):
+    """
+    Running score aggregates per article, maintained by add_score
+    
+    Holds the count plus per-category sums and sums of squares so averages
+    and variances can be read without scanning the scores table. The
+    overall average is stored denormalized and indexed for range filters.
+    """
+    __tablename__ = 'article_stats'
+    
+    article_id = Column(Integer, ForeignKey('articles.id'), primary_key=True)
+    score_count = Column(Integer, nullable=False, default=0)
+    
+    accuracy_sum = Column(Integer, nullable=False, default=0)
+    credibility_sum = Column(Integer, nullable=False, default=0)
+    citation_sum = Column(Integer, nullable=False, default=0)
+    reasoning_sum = Column(Integer, nullable=False, default=0)
+    confidence_sum = Column(Integer, nullable=False, default=0)
+    
+    accuracy_sumsq = Column(Integer, nullable=False, default=0)
+    credibility_sumsq = Column(Integer, nullable=False, default=0)
+    citation_sumsq = Column(Integer, nullable=False, default=0)
+    reasoning_sumsq = Column(Integer, nullable=False, default=0)
+    confidence_sumsq = Column(Integer, nullable=False, default=0)
+    
+    overall_average = Column(Float, nullable=False, default=0, index=True)
+    last_scored_at = Column(DateTime)
+    
+    def to_dict(self):
+        n = self.score_count
+        cat_avgs = {}
+        cat_vars = {}
+        for cat in SCORE_CATEGORIES:
+            total = getattr(self, f'{cat}_sum')
+            mean = total / n if n else 0
+            cat_avgs[cat] = mean
+            cat_vars[cat] = max(getattr(self, f'{cat}_sumsq') / n - mean * mean, 0) if n else 0
+        
+        return {
+            'count': n,
+            'category_averages': cat_avgs,
+            'category_variances': cat_vars,
+            'overall_average': self.overall_average,
+            'last_scored_at': self.last_scored_at.isoformat() if self.last_scored_at else None
+        }
+
+
+class DataVersion(Base):
+    """
+    Single-row counter bumped by every write that changes what the read APIs return
+    
+    Readers compare it with a version they saw earlier to tell whether data
+    is unchanged without querying the articles or scores tables.
+    """
+    __tablename__ = 'data_version'
+    
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class ImportJob(Base):
+    """
+    Progress and outcome of a background article import
+    
+    Kept in the database rather than in process memory so any gunicorn
+    worker can report on, or cancel, a job running in another.
+    """
+    __tablename__ = 'import_jobs'
+    
+    id = Column(String(32), primary_key=True)
+    source = Column(String(512), nullable=False)  # Uploaded filename or sheet URL
+    status = Column(String(16), nullable=False, default='queued')
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    
+    rows_parsed = Column(Integer, nullable=False, default=0)
+    articles_found = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    inserted = Column(Integer, nullable=False, default=0)
+    duplicate_count = Column(Integer, nullable=False, default=0)
+    duplicates = Column(JSON, default=list)  # First few duplicate titles
+    error = Column(Text)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+    
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'source': self.source,
+            'status': self.status,
+            'cancel_requested': self.cancel_requested,
+            'rows_parsed': self.rows_parsed,
+            'articles_found': self.articles_found,
+            'processed': self.processed,
+            'inserted': self.inserted,
+            'duplicate_count': self.duplicate_count,
+            'duplicates': self.duplicates or [],
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class ImportHistory(Base):
+    """
+    Outcome of a completed import, keyed by a hash of the imported content
+    
+    Lets a re-upload of the same file (or re-import of an unchanged sheet)
+    be recognized and skipped. Only the most recently used entries are
+    kept; see DatabaseManager.record_import_history.
+    """
+    __tablename__ = 'import_history'
+    
+    content_hash = Column(String(64), primary_key=True)
+    job_id = Column(String(32), nullable=False)
+    source = Column(String(512), nullable=False)
+    rows_parsed = Column(Integer, nullable=False, default=0)
+    articles_found = Column(Integer, nullable=False, default=0)
+    inserted = Column(Integer, nullable=False, default=0)
+    duplicate_count = Column(Integer, nullable=False, default=0)
+    completed_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)
+    
+    def to_dict(self):
+        return {
+            'job_id': self.job_id,
+            'source': self.source,
+            'rows_parsed': self.rows_parsed,
+            'articles_found': self.articles_found,
+            'inserted': self.inserted,
+            'duplicate_count': self.duplicate_count,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+
+
+class ChangeEvent(Base):
+    """
+    Compact record of a committed write, for the live update feed
+    
+    Written in the same transaction as the change it describes, after the
+    data_version bump, so on PostgreSQL the version row lock orders event
+    ids by commit and a reader polling for id > last_seen never skips one.
+    """
+    __tablename__ = 'change_events'
+    
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(32), nullable=False)  # 'score_added' or 'articles_imported'
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'data': self.payload
+        }
+
+
+def derive_pool_settings():
+    """
+    Derive connection pool size from the gunicorn worker/thread layout
+    
+    Under gunicorn (GUNICORN_THREADS is exported by gunicorn.conf.py) each
+    worker gets one pooled connection per request thread plus one for the
+    write-behind flusher, with the same again as burst overflow; elsewhere
+    the previous 5 + 10 applies. When DB_MAX_CONNECTIONS is set, the pool
+    shrinks so workers x (pool + overflow) stays within it.
+    DB_POOL_SIZE / DB_MAX_OVERFLOW override the result.
+    
+    Returns:
+        Tuple of (pool_size, max_overflow)
+    """
+    workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+    threads = os.environ.get('GUNICORN_THREADS')
+    
+    if threads:
+        pool_size = int(threads) + 1
+        max_overflow = pool_size
+    else:
+        pool_size, max_overflow = 5, 10
+    pool_size = int(os.environ.get('DB_POOL_SIZE', pool_size))
+    
+    max_connections = os.environ.get('DB_MAX_CONNECTIONS')
+    if max_connections:
+        per_worker = max(int(max_connections) // max(workers, 1), 1)
+        pool_size = min(pool_size, per_worker)
+        max_overflow = max(min(max_overflow, per_worker - pool_size), 0)
+    
+    max_overflow = int(os.environ.get('DB_MAX_OVERFLOW', max_overflow))
+    return pool_size, max_overflow
+
+
 class DatabaseManager:
     """Manages database connections and provides data access methods"""
     
-    def __init__(self, database_url=None):
+    def __init__(self, database_url=None, sqlite_profile=True, create_schema=None, pool_size=None, max_overflow=None):
         """
         Initialize database connection
         
         Args:
             database_url: PostgreSQL connection string. If None, uses DATABASE_URL env var
                          or falls back to SQLite for local development
+            sqlite_profile: Apply the production SQLite profile (WAL, pragmas,
+                            SQLite-sized pool) when the URL is a SQLite one
+            create_schema: Create/migrate tables and indexes now. Defaults to
+                           True unless the gunicorn master already did it
+            pool_size, max_overflow: Connection pool sizing; defaults come
+                                     from derive_pool_settings()
         """
         if database_url is None:
             database_url = os.environ.get('DATABASE_URL')
@@ -87,21 +353,281 @@ class DatabaseManager:
             if not database_url:
                 database_url = 'sqlite:///article_scores.db'
         
-        # Create engine with connection pooling
-        self.engine = create_engine(
-            database_url,
-            poolclass=QueuePool,
-            pool_size=5,
-            max_overflow=10,
-            pool_pre_ping=True  # Verify connections before using
-        )
+        if create_schema is None:
+            create_schema = os.environ.get(SCHEMA_READY_ENV) != '1'
         
-        # Create tables if they don't exist
-        Base.metadata.create_all(self.engine)
+        derived_pool_size, derived_max_overflow = derive_pool_settings()
+        pool_size = pool_size or derived_pool_size
+        max_overflow = derived_max_overflow if max_overflow is None else max_overflow
+        
+        if sqlite_profile and database_url.startswith('sqlite'):
+            self.engine = self._create_sqlite_engine(database_url, pool_size)
+        else:
+            # Create engine with connection pooling
+            self.engine = create_engine(
+                database_url,
+                poolclass=QueuePool,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_pre_ping=True  # Verify connections before using
+            )
+        
+        if create_schema:
+            self.setup_schema()
         
         # Create session factory
         session_factory = sessionmaker(bind=self.engine)
         self.Session = scoped_session(session_factory)
+        
+        # Set by query_metrics.QueryMetrics.attach when instrumentation is on
+        self.query_metrics = None
+        
+        # Set by read_cache.ReadCache.attach when read caching is on
+        self.read_cache = None
+        
+        # Set by single_flight.SingleFlight.attach when read coalescing is on
+        self.single_flight = None
+        
+        # Set by change_feed.ChangeFeed.attach when live updates are on;
+        # writes only record change events while it is set
+        self.change_feed = None
+    
+    def setup_schema(self):
+        """Create tables, run in-place migrations and create missing indexes"""
+        Base.metadata.create_all(self.engine)
+        self._ensure_data_version()
+        # Before migrate_url_hash, so its merges of duplicate articles only
+        # rebuild the survivors' rows in an otherwise complete table
+        self._ensure_article_stats()
+        self.migrate_url_hash()
+        self._ensure_indexes()
+    
+    def dispose_after_fork(self):
+        """
+        Drop pooled connections inherited across fork() in a worker process
+        
+        The parent's connections are discarded without being closed, since
+        closing them would tear down sockets the parent still owns; the pool
+        opens fresh connections on demand in this process.
+        """
+        self.Session.remove()
+        self.engine.dispose(close=False)
+    
+    @staticmethod
+    def _create_sqlite_engine(database_url, pool_size=5):
+        """
+        Create a SQLite engine tuned for several worker processes
+        
+        Every new connection gets WAL journaling (readers no longer block on
+        the writer), synchronous=NORMAL (durable at checkpoints, no fsync per
+        commit in WAL mode), a busy timeout so writers wait for the lock
+        instead of failing with "database is locked", and larger mmap/page
+        caches. SQLite only allows one writer at a time, so the pool is kept
+        small and skips pre-ping, which is pointless for a local file.
+        """
+        if database_url in ('sqlite://', 'sqlite:///:memory:'):
+            # A private in-memory database only exists on a single connection
+            engine = create_engine(
+                database_url,
+                poolclass=StaticPool,
+                connect_args={'check_same_thread': False}
+            )
+            DatabaseManager._begin_before_savepoints(engine)
+            return engine
+        
+        engine = create_engine(
+            database_url,
+            poolclass=QueuePool,
+            pool_size=pool_size,
+            max_overflow=0,
+            pool_timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+            connect_args={
+                'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000,
+                'check_same_thread': False
+            }
+        )
+        
+        @event.listens_for(engine, 'connect')
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')
+            cursor.execute(f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}')
+            cursor.execute(f'PRAGMA mmap_size={SQLITE_MMAP_SIZE}')
+            cursor.execute(f'PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}')
+            cursor.execute('PRAGMA temp_store=MEMORY')
+            cursor.close()
+        
+        DatabaseManager._begin_before_savepoints(engine)
+        return engine
+    
+    @staticmethod
+    def _begin_before_savepoints(engine):
+        """
+        Make SAVEPOINTs nest inside a real transaction on SQLite
+        
+        The sqlite3 driver only emits BEGIN before INSERT/UPDATE/DELETE, so a
+        SAVEPOINT issued first starts the transaction itself and releasing it
+        commits. Emitting BEGIN IMMEDIATE beforehand keeps every savepoint's
+        work inside the session's transaction. Reads still run outside one,
+        as before, so they never hold a snapshot that a later write would
+        have to upgrade.
+        """
+        @event.listens_for(engine, 'savepoint')
+        def begin_transaction(conn, name):
+            dbapi_connection = conn.connection.dbapi_connection
+            if not dbapi_connection.in_transaction:
+                dbapi_connection.execute('BEGIN IMMEDIATE')
+    
+    def _ensure_indexes(self):
+        """
+        Create indexes added after a table was first created
+        
+        create_all only emits CREATE INDEX for tables it creates, so indexes
+        added to existing models are created here if missing.
+        """
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=self.engine, checkfirst=True)
+    
+    def _ensure_data_version(self):
+        """Create the data_version row if missing"""
+        session = sessionmaker(bind=self.engine)()
+        try:
+            if session.get(DataVersion, 1) is None:
+                session.add(DataVersion(id=1, version=0))
+                session.commit()
+        finally:
+            session.close()
+    
+    def _ensure_article_stats(self):
+        """
+        Backfill article_stats for every scored article that lacks a row
+        
+        Every read of per-article aggregates (score filters, exports, the
+        bootstrap list) goes through article_stats, so an upgraded database
+        (or one only partly backfilled) must not leave scored articles out.
+        """
+        session = sessionmaker(bind=self.engine)()
+        try:
+            missing = session.query(Score.article_id).filter(
+                ~exists().where(ArticleStats.article_id == Score.article_id)
+            ).first()
+            if missing is None:
+                return
+            count = self._rebuild_article_stats(session, missing_only=True)
+            self._bump_data_version(session)
+            session.commit()
+            logger.info('Backfilled article_stats for %d articles', count)
+        except IntegrityError:
+            # Another worker backfilled the same articles first
+            session.rollback()
+        except Exception:
+            session.rollback()
+            logger.exception('Backfilling article_stats failed; run "python database.py backfill-stats"')
+        finally:
+            session.close()
+    
+    def migrate_url_hash(self, batch_size=1000):
+        """
+        Add and backfill articles.url_hash on databases that predate it
+        
+        Idempotent and safe to run from several workers at once: the column
+        is added if missing, rows without a hash are filled in batches, and
+        the old unique index on the full URL is dropped once the hash index
+        exists. Pre-existing URLs that only differ by scheme/host case now
+        identify the same article, so such duplicates are merged into the
+        first one: their scores move over and its aggregates are rebuilt. Runs automatically at startup; for very large tables run
+        'python database.py migrate-url-hash' ahead of the deploy.
+        """
+        columns = {c['name'] for c in sa_inspect(self.engine).get_columns('articles')}
+        if 'url_hash' not in columns:
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(text('ALTER TABLE articles ADD COLUMN url_hash VARCHAR(32)'))
+            except Exception:
+                # Another worker added it first
+                pass
+        
+        while True:
+            with self.engine.begin() as conn:
+                rows = conn.execute(
+                    text('SELECT id, url FROM articles WHERE url_hash IS NULL LIMIT :n'),
+                    {'n': batch_size}
+                ).fetchall()
+                if not rows:
+                    break
+                
+                taken = {h: article_id for article_id, h in conn.execute(
+                    text('SELECT id, url_hash FROM articles WHERE url_hash IN :hashes').bindparams(
+                        bindparam('hashes', expanding=True)
+                    ),
+                    {'hashes': [url_hash(url) for _, url in rows]}
+                )}
+                updates = []
+                merges = []
+                for article_id, url in rows:
+                    h = url_hash(url)
+                    if h in taken:
+                        merges.append({'id': article_id, 'into': taken[h]})
+                    else:
+                        taken[h] = article_id
+                        updates.append({'id': article_id, 'h': h})
+                
+                if updates:
+                    conn.execute(text('UPDATE articles SET url_hash = :h WHERE id = :id'), updates)
+                if merges:
+                    conn.execute(text('UPDATE scores SET article_id = :into WHERE article_id = :id'), merges)
+                    conn.execute(text('DELETE FROM article_stats WHERE article_id = :id'), merges)
+                    conn.execute(text('DELETE FROM articles WHERE id = :id'), merges)
+                    
+                    # Rebuild the surviving articles' aggregates in this transaction
+                    session = Session(bind=conn)
+                    try:
+                        self._rebuild_article_stats(session, {merge['into'] for merge in merges})
+                        session.flush()
+                    finally:
+                        session.close()
+        
+        indexes = {index['name'] for index in sa_inspect(self.engine).get_indexes('articles')}
+        if 'ix_articles_url' in indexes:
+            try:
+                for index in Article.__table__.indexes:
+                    index.create(bind=self.engine, checkfirst=True)
+                with self.engine.begin() as conn:
+                    conn.execute(text('DROP INDEX ix_articles_url'))
+            except Exception:
+                # Another worker is migrating concurrently
+                pass
+    
+    @staticmethod
+    def encode_cursor(*values):
+        """Encode keyset values as an opaque URL-safe cursor string"""
+        raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+    
+    @staticmethod
+    def decode_cursor(cursor):
+        """
+        Decode a cursor produced by encode_cursor
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except Exception:
+            raise ValueError('Invalid cursor')
+        if not isinstance(values, list):
+            raise ValueError('Invalid cursor')
+        return values
+    
+    @staticmethod
+    def clamp_page_size(limit):
+        """Clamp a requested page size to [1, MAX_PAGE_SIZE]"""
+        if limit is None:
+            return DEFAULT_PAGE_SIZE
+        return max(1, min(int(limit), MAX_PAGE_SIZE))
     
     def get_session(self):
         """Get a database session"""
@@ -122,6 +648,84 @@ class DatabaseManager:
         finally:
             session.close()
     
+    def get_articles_page(self, cursor=None, limit=None, include_stats=False):
+        """
+        Get one page of articles, newest first, using keyset pagination
+        
+        Args:
+            cursor: Cursor from a previous page's next_cursor, or None for the first page
+            limit: Page size, clamped to MAX_PAGE_SIZE
+            include_stats: Add each article's 'count' and 'average' from its
+                           article_stats row (0 for unscored articles)
+            
+        Returns:
+            Tuple of (list of article dicts, next_cursor or None on the last page)
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        limit = self.clamp_page_size(limit)
+        session = self.get_session()
+        try:
+            columns = [Article.id, Article.url, Article.title, Article.created_at]
+            if include_stats:
+                columns += [ArticleStats.score_count, ArticleStats.overall_average]
+            query = session.query(*columns)
+            if include_stats:
+                query = query.outerjoin(ArticleStats, ArticleStats.article_id == Article.id)
+            
+            if cursor:
+                try:
+                    created_at, article_id = self.decode_cursor(cursor)
+                    created_at = datetime.fromisoformat(created_at)
+                    article_id = int(article_id)
+                except (TypeError, ValueError):
+                    raise ValueError('Invalid cursor')
+                query = query.filter(or_(
+                    Article.created_at < created_at,
+                    and_(Article.created_at == created_at, Article.id < article_id)
+                ))
+            
+            rows = query.order_by(Article.created_at.desc(), Article.id.desc()).limit(limit + 1).all()
+            
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = self.encode_cursor(rows[-1].created_at, rows[-1].id)
+            
+            if include_stats:
+                articles = [{
+                    'URL': row.url,
+                    'Title': row.title,
+                    'count': row.score_count or 0,
+                    'average': row.overall_average or 0
+                } for row in rows]
+            else:
+                articles = [{'URL': row.url, 'Title': row.title} for row in rows]
+            return articles, next_cursor
+        finally:
+            session.close()
+    
+    def count_articles(self):
+        """
+        Get the total number of articles from the cheapest available source
+        
+        On PostgreSQL this reads the planner's row estimate from pg_class
+        (kept current by autovacuum) instead of scanning the table; other
+        backends, or a table that hasn't been analyzed yet, use COUNT(*).
+        """
+        session = self.get_session()
+        try:
+            if self.engine.dialect.name == 'postgresql':
+                estimate = session.execute(
+                    text("SELECT reltuples::bigint FROM pg_class WHERE relname = 'articles'")
+                ).scalar()
+                if estimate and estimate > 0:
+                    return int(estimate)
+            return session.query(func.count(Article.id)).scalar()
+        finally:
+            session.close()
+    
     def add_articles(self, articles_data):
         """
         Add multiple articles, skipping duplicates
@@ -132,34 +736,71 @@ class DatabaseManager:
         Returns:
             Tuple of (merged_articles, new_count, duplicates)
         """
+        new_count, duplicates = self.insert_articles(articles_data)
+        
+        # Get all articles to return
+        all_articles = self.get_all_articles()
+        
+        return all_articles, new_count, duplicates
+    
+    def insert_articles(self, articles_data):
+        """
+        Insert articles in one transaction, skipping duplicates
+        
+        Like add_articles, without reading back the full article list, so
+        large imports can commit chunk by chunk.
+        
+        Args:
+            articles_data: List of dicts with 'URL' and 'Title' keys
+            
+        Returns:
+            Tuple of (new_count, duplicates)
+        """
         session = self.get_session()
         try:
-            new_count = 0
             duplicates = []
             
+            # Look the whole chunk up in one query, before taking any lock
+            existing = self._titles_by_hash(session, {url_hash(a['URL']) for a in articles_data})
+            
+            new_by_hash = {}
             for article_data in articles_data:
                 url = article_data['URL']
                 title = article_data['Title']
+                h = url_hash(url)
                 
-                # Check if article already exists
-                existing = session.query(Article).filter_by(url=url).first()
-                
-                if existing:
+                known_title = existing.get(h) or new_by_hash.get(h, {}).get('Title')
+                if known_title is not None:
                     # Duplicate found - check by title as well for reporting
-                    if existing.title.lower() == title.lower():
+                    if known_title.lower() == title.lower():
                         duplicates.append(title)
                 else:
-                    # New article
-                    article = Article(url=url, title=title)
-                    session.add(article)
-                    new_count += 1
+                    new_by_hash[h] = {'URL': url, 'Title': title}
             
-            session.commit()
+            if new_by_hash:
+                # Held only for the inserts (see _lock_data_version); drop URLs
+                # another writer inserted since the lookup above
+                self._lock_data_version(session)
+                for h, title in self._titles_by_hash(session, new_by_hash).items():
+                    if title.lower() == new_by_hash[h]['Title'].lower():
+                        duplicates.append(new_by_hash[h]['Title'])
+                    del new_by_hash[h]
             
-            # Get all articles to return
-            all_articles = self.get_all_articles()
+            new_articles = list(new_by_hash.values())
+            new_count = len(new_articles)
+            session.add_all([Article(url=a['URL'], title=a['Title']) for a in new_articles])
             
-            return all_articles, new_count, duplicates
+            if new_count:
+                self._bump_data_version(session)
+                payload = {'count': new_count}
+                if new_count <= CHANGE_EVENT_MAX_ARTICLES:
+                    payload['articles'] = new_articles
+                self._record_changes(session, [('articles_imported', payload)])
+            session.commit()
+            if new_count:
+                self._invalidate_read_cache()
+            
+            return new_count, duplicates
             
         except Exception as e:
             session.rollback()
@@ -167,44 +808,225 @@ class DatabaseManager:
         finally:
             session.close()
     
+    def _titles_by_hash(self, session, hashes):
+        """Map the url_hash of each existing article among the given hashes to its title"""
+        hashes = list(hashes)
+        titles = {}
+        for i in range(0, len(hashes), 500):
+            for h, title in session.query(Article.url_hash, Article.title).filter(Article.url_hash.in_(hashes[i:i + 500])):
+                titles[h] = title
+        return titles
+    
     def get_article_by_url(self, url):
         """Get article by URL"""
         session = self.get_session()
         try:
-            return session.query(Article).filter_by(url=url).first()
+            return session.query(Article).filter_by(url_hash=url_hash(url)).first()
         finally:
             session.close()
     
     # Score operations
     
+    def _score_rows_query(self, session):
+        """
+        Build a single joined query yielding (url, score columns...) rows
+        
+        Selecting plain columns instead of ORM objects avoids the lazy
+        Article.scores load per article (N+1) and the identity-map overhead.
+        """
+        return session.query(
+            Article.url,
+            *[getattr(Score, cat) for cat in SCORE_CATEGORIES],
+            Score.notes,
+            Score.timestamp
+        ).join(Score, Score.article_id == Article.id)
+    
+    @staticmethod
+    def _score_row_to_dict(row):
+        """Convert a row from _score_rows_query to the Score.to_dict() shape"""
+        score = {cat: getattr(row, cat) for cat in SCORE_CATEGORIES}
+        score['notes'] = row.notes
+        score['timestamp'] = row.timestamp.isoformat()
+        return score
+    
     def get_all_scores(self):
         """
         Get all scores in the format expected by the app
         
+        Served through the read cache / single-flight when attached; the
+        returned dict may then be shared and must not be mutated.
+        
         Returns:
             Dict mapping URLs to lists of score dicts
         """
+        return self._shared_read('all_scores', self._load_all_scores)
+    
+    def _load_all_scores(self):
+        """Build the URL -> scores map for get_all_scores"""
         session = self.get_session()
         try:
-            articles = session.query(Article).all()
+            query = self._score_rows_query(session).order_by(Score.article_id, Score.id)
             scores_data = {}
             
-            for article in articles:
-                if article.scores:
-                    scores_data[article.url] = [score.to_dict() for score in article.scores]
+            for row in query.yield_per(1000):
+                scores_data.setdefault(row.url, []).append(self._score_row_to_dict(row))
             
             return scores_data
         finally:
             session.close()
     
+    def get_scores_page(self, cursor=None, limit=None):
+        """
+        Get one page of scores in insertion order, using keyset pagination on score id
+        
+        An article's scores may span pages; callers merge pages by
+        appending to each URL's list.
+        
+        Args:
+            cursor: Cursor from a previous page's next_cursor, or None for the first page
+            limit: Page size, clamped to MAX_PAGE_SIZE
+            
+        Returns:
+            Tuple of (dict mapping URLs to lists of score dicts, next_cursor or None)
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        limit = self.clamp_page_size(limit)
+        session = self.get_session()
+        try:
+            query = self._score_rows_query(session).add_columns(Score.id)
+            
+            if cursor:
+                try:
+                    (score_id,) = self.decode_cursor(cursor)
+                    score_id = int(score_id)
+                except (TypeError, ValueError):
+                    raise ValueError('Invalid cursor')
+                query = query.filter(Score.id > score_id)
+            
+            rows = query.order_by(Score.id).limit(limit + 1).all()
+            
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = self.encode_cursor(rows[-1].id)
+            
+            scores_data = {}
+            for row in rows:
+                scores_data.setdefault(row.url, []).append(self._score_row_to_dict(row))
+            
+            return scores_data, next_cursor
+        finally:
+            session.close()
+    
+    # Delta sync operations
+    
+    def get_changes_cursor(self):
+        """
+        Get a get_changes cursor for the current state
+        
+        Read before loading a snapshot, so changes committed while it loads
+        are returned (again, at worst) by the first get_changes call.
+        """
+        session = self.get_session()
+        try:
+            article_id = session.query(func.max(Article.id)).scalar() or 0
+            score_id = session.query(func.max(Score.id)).scalar() or 0
+            return self.encode_cursor(article_id, score_id)
+        finally:
+            session.close()
+    
+    def get_changes(self, cursor, limit=None):
+        """
+        Get articles and scores created after a cursor
+        
+        The cursor holds the last article and score IDs seen, so each call
+        is two primary-key range scans costing O(changes). Writers allocate
+        these IDs under the data_version lock (see _lock_data_version), so
+        they become visible in ID order and a row with a lower ID can't
+        commit after the cursor has moved past it.
+        
+        Args:
+            cursor: Cursor from get_changes_cursor or a previous next_cursor
+            limit: Most articles and most scores returned, clamped to MAX_PAGE_SIZE
+            
+        Returns:
+            Dict with 'articles' (new articles with 'count' and 'average'),
+            'scores' (URL -> list of new score dicts, each with its 'id'),
+            'article_stats' (URL -> {'count', 'average'} for every article
+            with new scores), 'next_cursor' and 'has_more' (another call
+            would return more right away)
+            
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        limit = self.clamp_page_size(limit)
+        try:
+            article_id, score_id = (int(value) for value in self.decode_cursor(cursor))
+        except (TypeError, ValueError):
+            raise ValueError('Invalid cursor')
+        
+        session = self.get_session()
+        try:
+            article_rows = session.query(
+                Article.id, Article.url, Article.title, Article.created_at,
+                ArticleStats.score_count, ArticleStats.overall_average
+            ).outerjoin(ArticleStats, ArticleStats.article_id == Article.id).filter(
+                Article.id > article_id
+            ).order_by(Article.id).limit(limit + 1).all()
+            
+            score_rows = self._score_rows_query(session).add_columns(Score.id, Score.article_id).filter(
+                Score.id > score_id
+            ).order_by(Score.id).limit(limit + 1).all()
+            
+            more_articles = len(article_rows) > limit
+            more_scores = len(score_rows) > limit
+            article_rows = article_rows[:limit]
+            score_rows = score_rows[:limit]
+            
+            articles = [{
+                'URL': row.url,
+                'Title': row.title,
+                'count': row.score_count or 0,
+                'average': row.overall_average or 0
+            } for row in article_rows]
+            
+            scores = {}
+            for row in score_rows:
+                score = self._score_row_to_dict(row)
+                score['id'] = row.id
+                scores.setdefault(row.url, []).append(score)
+            
+            article_stats = {}
+            scored_ids = list({row.article_id for row in score_rows})
+            for i in range(0, len(scored_ids), 500):
+                for row in session.query(Article.url, ArticleStats.score_count, ArticleStats.overall_average).join(
+                    ArticleStats, ArticleStats.article_id == Article.id
+                ).filter(Article.id.in_(scored_ids[i:i + 500])):
+                    article_stats[row.url] = {'count': row.score_count, 'average': row.overall_average}
+            
+            if article_rows:
+                article_id = article_rows[-1].id
+            if score_rows:
+                score_id = score_rows[-1].id
+            
+            return {
+                'articles': articles,
+                'scores': scores,
+                'article_stats': article_stats,
+                'next_cursor': self.encode_cursor(article_id, score_id),
+                'has_more': more_articles or more_scores
+            }
+        finally:
+            session.close()
+    
     def get_scores_for_article(self, url):
         """Get all scores for a specific article URL"""
         session = self.get_session()
         try:
-            article = session.query(Article).filter_by(url=url).first()
-            if article:
-                return [score.to_dict() for score in article.scores]
-            return []
+            query = self._score_rows_query(session).filter(Article.url_hash == url_hash(url)).order_by(Score.id)
+            return [self._score_row_to_dict(row) for row in query]
         finally:
             session.close()
     
@@ -218,36 +1040,647 @@ class DatabaseManager:
         """
         session = self.get_session()
         try:
-            # Get or create article
-            article = session.query(Article).filter_by(url=url).first()
-            if not article:
-                # Article doesn't exist - create it with URL as title
-                article = Article(url=url, title=url[:100])
-                session.add(article)
-                session.flush()  # Get the ID
-            
-            # Create score
-            score = Score(
-                article_id=article.id,
-                accuracy=score_data['accuracy'],
-                credibility=score_data['credibility'],
-                citation=score_data['citation'],
-                reasoning=score_data['reasoning'],
-                confidence=score_data['confidence'],
-                notes=score_data.get('notes', '')
+            article_id = session.query(Article.id).filter(Article.url_hash == url_hash(url)).scalar()
+            
+            # Articles and scores are inserted from here on
+            self._lock_data_version(session)
+            if article_id is None:
+                article_id = self._get_or_create_article(session, url).id
+            self._add_score_in_session(session, article_id, score_data)
+            events = self._score_change_events(session, [article_id])
+            self._bump_data_version(session)
+            self._record_changes(session, events)
+            session.commit()
+            self._invalidate_read_cache()
+            
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def add_scores_bulk(self, items):
+        """
+        Add many scores, across many articles, in a single transaction
+        
+        Each item runs in its own SAVEPOINT, so a failing item is rolled back
+        and reported without affecting the rest of the batch; everything that
+        succeeded is committed once at the end (on SQLite too, see
+        _begin_before_savepoints).
+        
+        Args:
+            items: List of (url, score_data) tuples; score_data is validated
+                   by the caller as for add_score
+            
+        Returns:
+            List of per-item result dicts, in input order, with 'url' and
+            'success' keys plus 'error' for failed items
+        """
+        session = self.get_session()
+        try:
+            # Resolve every referenced article up front instead of per item
+            hashes = list({url_hash(url) for url, _ in items})
+            ids_by_hash = {}
+            for i in range(0, len(hashes), 500):
+                chunk = hashes[i:i + 500]
+                for article_id, h in session.query(Article.id, Article.url_hash).filter(Article.url_hash.in_(chunk)):
+                    ids_by_hash[h] = article_id
+            article_ids = {url: ids_by_hash[url_hash(url)] for url, _ in items if url_hash(url) in ids_by_hash}
+            
+            # Articles and scores are inserted from here on
+            self._lock_data_version(session)
+            
+            results = []
+            for url, score_data in items:
+                try:
+                    with session.begin_nested():
+                        article_id = article_ids.get(url)
+                        if article_id is None:
+                            article_id = self._get_or_create_article(session, url).id
+                        self._add_score_in_session(session, article_id, score_data)
+                    article_ids[url] = article_id
+                    results.append({'url': url, 'success': True})
+                except Exception as e:
+                    results.append({'url': url, 'success': False, 'error': str(e)})
+            
+            saved = any(result['success'] for result in results)
+            if saved:
+                scored_ids = {article_ids[result['url']] for result in results if result['success']}
+                events = self._score_change_events(session, scored_ids)
+                self._bump_data_version(session)
+                self._record_changes(session, events)
+            session.commit()
+            if saved:
+                self._invalidate_read_cache()
+            return results
+        
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def _get_or_create_article(self, session, url):
+        """Get an article by URL, creating a placeholder titled by its URL if missing"""
+        article = session.query(Article).filter_by(url_hash=url_hash(url)).first()
+        if not article:
+            # Article doesn't exist - create it with URL as title
+            article = Article(url=url, title=url[:100])
+            session.add(article)
+            session.flush()  # Get the ID
+        return article
+    
+    def _add_score_in_session(self, session, article_id, score_data):
+        """Insert a score and update the article's aggregates without committing"""
+        score = Score(
+            article_id=article_id,
+            accuracy=score_data['accuracy'],
+            credibility=score_data['credibility'],
+            citation=score_data['citation'],
+            reasoning=score_data['reasoning'],
+            confidence=score_data['confidence'],
+            notes=score_data.get('notes', ''),
+            timestamp=datetime.utcnow()
+        )
+        
+        session.add(score)
+        self._update_article_stats(session, article_id, score)
+        return score
+    
+    def _update_article_stats(self, session, article_id, score):
+        """
+        Fold a new score into the article's running aggregates
+        
+        Uses an atomic upsert (INSERT ... ON CONFLICT DO UPDATE with column
+        arithmetic) so concurrent writers in other workers can't lose
+        increments, and two concurrent first scores for an article can't
+        both try to insert its row. Runs inside the caller's transaction.
+        """
+        values = {cat: getattr(score, cat) for cat in SCORE_CATEGORIES}
+        score_total = sum(values.values())
+        
+        updates = {ArticleStats.score_count: ArticleStats.score_count + 1}
+        for cat, value in values.items():
+            updates[getattr(ArticleStats, f'{cat}_sum')] = getattr(ArticleStats, f'{cat}_sum') + value
+            updates[getattr(ArticleStats, f'{cat}_sumsq')] = getattr(ArticleStats, f'{cat}_sumsq') + value * value
+        
+        category_sums = sum(getattr(ArticleStats, f'{cat}_sum') for cat in SCORE_CATEGORIES)
+        updates[ArticleStats.overall_average] = (
+            (category_sums + score_total) * 1.0
+            / ((ArticleStats.score_count + 1) * len(SCORE_CATEGORIES))
+        )
+        updates[ArticleStats.last_scored_at] = score.timestamp
+        
+        first_score = {
+            'article_id': article_id,
+            'score_count': 1,
+            'overall_average': score_total / len(SCORE_CATEGORIES),
+            'last_scored_at': score.timestamp
+        }
+        for cat, value in values.items():
+            first_score[f'{cat}_sum'] = value
+            first_score[f'{cat}_sumsq'] = value * value
+        
+        dialect_insert = {'postgresql': postgresql_insert, 'sqlite': sqlite_insert}.get(self.engine.dialect.name)
+        if dialect_insert is not None:
+            stmt = dialect_insert(ArticleStats).values(**first_score).on_conflict_do_update(
+                index_elements=[ArticleStats.article_id],
+                set_={column.key: value for column, value in updates.items()}
             )
+            session.execute(stmt)
+            return
+        
+        # Other backends: update, inserting the row on first score
+        updated = session.query(ArticleStats).filter(
+            ArticleStats.article_id == article_id
+        ).update(updates, synchronize_session=False)
+        if not updated:
+            session.add(ArticleStats(**first_score))
+    
+    def _lock_data_version(self, session):
+        """
+        Take the data_version row lock right before inserting articles or scores
+        
+        Writers then allocate article and score IDs one transaction at a
+        time and commit in that order, so a reader that sees an ID has seen
+        every lower one (get_changes relies on this). Callers do their
+        lookups first, so the lock only covers the inserts themselves and
+        the _bump_data_version/commit that follow. On SQLite the
+        database-wide write lock already does this and FOR UPDATE is not
+        emitted.
+        """
+        session.query(DataVersion.id).filter(DataVersion.id == 1).with_for_update().first()
+    
+    def _bump_data_version(self, session):
+        """
+        Increment the data version inside the caller's transaction
+        
+        Called last before commit: on PostgreSQL the UPDATE holds the
+        data_version row lock until the transaction ends, so this keeps
+        concurrent writers' wait on it as short as possible. Writers that
+        insert articles or scores take the same lock slightly earlier, just
+        before their inserts (_lock_data_version).
+        """
+        updated = session.query(DataVersion).filter(DataVersion.id == 1).update(
+            {DataVersion.version: DataVersion.version + 1}, synchronize_session=False
+        )
+        if not updated:
+            session.add(DataVersion(id=1, version=1))
+    
+    def _score_change_events(self, session, article_ids):
+        """
+        Build 'score_added' events carrying each article's new aggregates
+        
+        Returns:
+            List of (kind, payload) tuples for _record_changes, or an empty
+            list when no change feed is attached
+        """
+        if self.change_feed is None:
+            return []
+        
+        rows = session.query(Article.url, Article.title, ArticleStats.score_count, ArticleStats.overall_average).join(
+            ArticleStats, ArticleStats.article_id == Article.id
+        ).filter(Article.id.in_(list(article_ids))).all()
+        return [('score_added', {
+            'url': row.url,
+            'title': row.title,
+            'count': row.score_count,
+            'average': row.overall_average
+        }) for row in rows]
+    
+    def _record_changes(self, session, events):
+        """
+        Add change events to the caller's transaction
+        
+        Called after _bump_data_version so the inserts happen while the
+        data_version row is locked. No-op unless a change feed is attached.
+        
+        Args:
+            events: List of (kind, payload) tuples
+        """
+        if self.change_feed is None:
+            return
+        session.add_all([ChangeEvent(kind=kind, payload=payload) for kind, payload in events])
+        # Make sure this process prunes the events it writes
+        self.change_feed.start()
+    
+    def get_data_version(self):
+        """
+        Get the current data version
+        
+        Returns:
+            Integer that increases whenever articles or scores change
+        """
+        session = self.get_session()
+        try:
+            return session.query(DataVersion.version).filter(DataVersion.id == 1).scalar() or 0
+        finally:
+            session.close()
+    
+    def _shared_read(self, key, compute):
+        """
+        Serve a read model through the attached read cache and/or single-flight
+        
+        Both are keyed on the current data version, so a caller is never
+        handed a result computed before a write it has already seen.
+        """
+        if self.read_cache is None and self.single_flight is None:
+            return compute()
+        
+        version = self.get_data_version()
+        if self.single_flight is not None:
+            compute = functools.partial(self.single_flight.do, (key, version), compute)
+        if self.read_cache is None:
+            return compute()
+        return self.read_cache.get_or_compute(key, version, compute)
+    
+    def _invalidate_read_cache(self):
+        """Drop this process's cached reads after a committed write"""
+        if self.read_cache is not None:
+            self.read_cache.invalidate()
+    
+    def get_article_stats(self, url):
+        """
+        Get precomputed score aggregates for an article
+        
+        Returns:
+            Dict from ArticleStats.to_dict(), or None if the article has no scores
+        """
+        session = self.get_session()
+        try:
+            stats = session.query(ArticleStats).join(
+                Article, Article.id == ArticleStats.article_id
+            ).filter(Article.url_hash == url_hash(url)).first()
+            return stats.to_dict() if stats else None
+        finally:
+            session.close()
+    
+    def get_scored_articles(self, score_range='All', include_scores=False, newest_first=False):
+        """
+        Get scored articles with their aggregates, filtered by overall average
+        
+        The range filter runs in SQL against the indexed
+        article_stats.overall_average column, so only matching articles are
+        read and returned.
+        
+        Args:
+            score_range: Key of SCORE_RANGES, or 'All' for every scored article
+            include_scores: Also attach each article's individual score dicts
+            newest_first: Order by article creation date descending instead
+                          of insertion order
             
-            session.add(score)
+        Returns:
+            List of dicts with 'url', 'title', 'count', 'overall_average'
+            and 'category_averages' (plus 'scores' if requested)
+        """
+        return list(self.iter_scored_articles(score_range, include_scores, newest_first))
+    
+    def iter_scored_articles(self, score_range='All', include_scores=False, newest_first=False):
+        """
+        Stream the articles get_scored_articles would return, one at a time
+        
+        Rows come from a single server-side query read in batches, so only
+        the current article (and its scores) is held in memory. Uses its own
+        session, which stays open until the generator is exhausted or closed,
+        so it is safe to consume from a streaming response.
+        """
+        session = self.Session.session_factory()
+        try:
+            conditions = [ArticleStats.score_count > 0]
+            if score_range in SCORE_RANGES:
+                low, high = SCORE_RANGES[score_range]
+                conditions.append(ArticleStats.overall_average.between(low, high))
+            
+            columns = [Article.id, Article.url, Article.title, ArticleStats]
+            if include_scores:
+                columns += [getattr(Score, cat) for cat in SCORE_CATEGORIES] + [Score.notes, Score.timestamp]
+            
+            query = session.query(*columns).join(
+                ArticleStats, ArticleStats.article_id == Article.id
+            ).filter(*conditions)
+            
+            if include_scores:
+                query = query.join(Score, Score.article_id == Article.id)
+            
+            if newest_first:
+                order = [Article.created_at.desc(), Article.id.desc()]
+            else:
+                order = [Article.id]
+            if include_scores:
+                order.append(Score.id)
+            
+            article = None
+            article_id = None
+            for row in query.order_by(*order).yield_per(1000):
+                if article is None or row.id != article_id:
+                    if article is not None:
+                        yield article
+                    article_id = row.id
+                    stats_dict = row.ArticleStats.to_dict()
+                    article = {
+                        'url': row.url,
+                        'title': row.title,
+                        'count': stats_dict['count'],
+                        'overall_average': stats_dict['overall_average'],
+                        'category_averages': stats_dict['category_averages']
+                    }
+                    if include_scores:
+                        article['scores'] = []
+                
+                if include_scores:
+                    article['scores'].append(self._score_row_to_dict(row))
+            
+            if article is not None:
+                yield article
+        finally:
+            session.close()
+    
+    # Change feed operations
+    
+    def get_change_events(self, after_id, limit=500):
+        """
+        Get committed change events newer than a given event
+        
+        Args:
+            after_id: Last event ID already seen
+            limit: Most events returned
+            
+        Returns:
+            List of dicts from ChangeEvent.to_dict(), oldest first
+        """
+        session = self.get_session()
+        try:
+            events = session.query(ChangeEvent).filter(
+                ChangeEvent.id > after_id
+            ).order_by(ChangeEvent.id).limit(limit).all()
+            return [e.to_dict() for e in events]
+        finally:
+            session.close()
+    
+    def get_latest_change_id(self):
+        """Get the ID of the newest change event, or 0 if there is none"""
+        session = self.get_session()
+        try:
+            return session.query(func.max(ChangeEvent.id)).scalar() or 0
+        finally:
+            session.close()
+    
+    def prune_change_events(self, max_age_seconds):
+        """
+        Delete change events older than max_age_seconds
+        
+        Returns:
+            Number of events deleted
+        """
+        session = self.get_session()
+        try:
+            cutoff = datetime.utcnow() - timedelta(seconds=max_age_seconds)
+            deleted = session.query(ChangeEvent).filter(
+                ChangeEvent.created_at < cutoff
+            ).delete(synchronize_session=False)
+            session.commit()
+            return deleted
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    # Import job operations
+    
+    def create_import_job(self, job_id, source):
+        """Record a newly queued import job"""
+        session = self.get_session()
+        try:
+            session.add(ImportJob(id=job_id, source=source[:512], status='queued'))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def get_import_job(self, job_id):
+        """
+        Get an import job's progress
+        
+        A job still 'running' without progress for IMPORT_STALE_SECONDS lost
+        its worker (jobs run in-process, so a crash or restart ends them
+        silently) and is marked failed here, when it is read.
+        
+        Returns:
+            Dict from ImportJob.to_dict(), or None if there is no such job
+        """
+        session = self.get_session()
+        try:
+            job = session.get(ImportJob, job_id)
+            if job and job.status == 'running' and job.updated_at and job.updated_at < datetime.utcnow() - timedelta(seconds=IMPORT_STALE_SECONDS):
+                now = datetime.utcnow()
+                session.query(ImportJob).filter(
+                    ImportJob.id == job_id,
+                    ImportJob.status == 'running',
+                    ImportJob.updated_at == job.updated_at
+                ).update({
+                    ImportJob.status: 'failed',
+                    ImportJob.error: 'Import stopped responding (the server may have restarted); please try again',
+                    ImportJob.updated_at: now,
+                    ImportJob.finished_at: now
+                }, synchronize_session=False)
+                session.commit()
+                session.refresh(job)
+            return job.to_dict() if job else None
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def update_import_job(self, job_id, **fields):
+        """
+        Update an import job's progress columns
+        
+        Returns:
+            True if the job has been asked to cancel
+        """
+        session = self.get_session()
+        try:
+            fields['updated_at'] = datetime.utcnow()
+            session.query(ImportJob).filter(ImportJob.id == job_id).update(fields, synchronize_session=False)
+            session.commit()
+            return bool(session.query(ImportJob.cancel_requested).filter(ImportJob.id == job_id).scalar())
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def request_import_cancel(self, job_id):
+        """
+        Ask a queued or running import job to stop
+        
+        The job stops before its next chunk; chunks already committed stay.
+        
+        Returns:
+            True if the job was still queued or running
+        """
+        session = self.get_session()
+        try:
+            updated = session.query(ImportJob).filter(
+                ImportJob.id == job_id,
+                ImportJob.status.in_(['queued', 'running'])
+            ).update({ImportJob.cancel_requested: True}, synchronize_session=False)
             session.commit()
+            return bool(updated)
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def get_import_history(self, content_hash):
+        """
+        Look up a completed import by content hash, marking it recently used
+        
+        Returns:
+            Dict from ImportHistory.to_dict(), or None if the content hasn't
+            been imported (or has aged out of the history)
+        """
+        session = self.get_session()
+        try:
+            entry = session.get(ImportHistory, content_hash)
+            if entry is None:
+                return None
+            entry.last_used_at = datetime.utcnow()
+            result = entry.to_dict()
+            session.commit()
+            return result
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def record_import_history(self, content_hash, job_id, source, outcome, max_entries=200):
+        """
+        Remember a completed import's outcome under its content hash
+        
+        Evicts the least recently used entries beyond max_entries.
+        
+        Args:
+            content_hash: Hash of the imported content
+            job_id: ID of the import job that applied it
+            source: Filename or sheet URL
+            outcome: Dict with rows_parsed, articles_found, inserted and
+                     duplicate_count
+            max_entries: History size
+        """
+        session = self.get_session()
+        try:
+            now = datetime.utcnow()
+            session.merge(ImportHistory(
+                content_hash=content_hash,
+                job_id=job_id,
+                source=source[:512],
+                rows_parsed=outcome['rows_parsed'],
+                articles_found=outcome['articles_found'],
+                inserted=outcome['inserted'],
+                duplicate_count=outcome['duplicate_count'],
+                completed_at=now,
+                last_used_at=now
+            ))
+            session.flush()
             
+            recent = session.query(ImportHistory.content_hash).order_by(
+                ImportHistory.last_used_at.desc()
+            ).limit(max_entries).subquery()
+            session.query(ImportHistory).filter(
+                ImportHistory.content_hash.notin_(session.query(recent.c.content_hash))
+            ).delete(synchronize_session=False)
+            session.commit()
         except Exception as e:
             session.rollback()
             raise e
         finally:
             session.close()
     
+    def backfill_article_stats(self):
+        """
+        Rebuild the article_stats table from the scores table
+        
+        One-off operation for databases that predate article_stats; safe to
+        re-run since it replaces every row in a single transaction.
+        
+        Returns:
+            Number of articles with stats written
+        """
+        session = self.get_session()
+        try:
+            count = self._rebuild_article_stats(session)
+            self._bump_data_version(session)
+            session.commit()
+            self._invalidate_read_cache()
+            return count
+        
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def _rebuild_article_stats(self, session, article_ids=None, missing_only=False):
+        """
+        Replace article_stats rows with aggregates computed from scores, without committing
+        
+        Args:
+            article_ids: Articles to rebuild, or None for all of them
+            missing_only: Only write rows for scored articles that have none,
+                          leaving existing rows alone
+        
+        Returns:
+            Number of articles with stats written
+        """
+        columns = [Score.article_id, func.count(Score.id), func.max(Score.timestamp)]
+        for cat in SCORE_CATEGORIES:
+            columns.append(func.sum(getattr(Score, cat)))
+            columns.append(func.sum(getattr(Score, cat) * getattr(Score, cat)))
+        
+        query = session.query(*columns)
+        stats_query = session.query(ArticleStats)
+        if article_ids is not None:
+            query = query.filter(Score.article_id.in_(article_ids))
+            stats_query = stats_query.filter(ArticleStats.article_id.in_(article_ids))
+        if missing_only:
+            query = query.filter(~exists().where(ArticleStats.article_id == Score.article_id))
+        rows = query.group_by(Score.article_id).all()
+        
+        if not missing_only:
+            stats_query.delete(synchronize_session=False)
+        
+        mappings = []
+        for row in rows:
+            article_id, count, last_scored_at = row[0], row[1], row[2]
+            stats = {
+                'article_id': article_id,
+                'score_count': count,
+                'last_scored_at': last_scored_at
+            }
+            total = 0
+            for i, cat in enumerate(SCORE_CATEGORIES):
+                stats[f'{cat}_sum'] = row[3 + 2 * i]
+                stats[f'{cat}_sumsq'] = row[4 + 2 * i]
+                total += row[3 + 2 * i]
+            stats['overall_average'] = total / (count * len(SCORE_CATEGORIES))
+            mappings.append(stats)
+        
+        session.bulk_insert_mappings(ArticleStats, mappings)
+        return len(mappings)
+    
     def get_statistics(self):
-        """Get database statistics"""
+        """Get database statistics, through the read cache / single-flight when attached"""
+        return self._shared_read('statistics', self._load_statistics)
+    
+    def _load_statistics(self):
+        """Run the counts behind get_statistics"""
         session = self.get_session()
         try:
             total_articles = session.query(Article).count()
@@ -274,10 +1707,10 @@ class DatabaseManager:
 db_manager = None
 
 
-def init_db(database_url=None):
+def init_db(database_url=None, **kwargs):
     """Initialize the global database manager"""
     global db_manager
-    db_manager = DatabaseManager(database_url)
+    db_manager = DatabaseManager(database_url, **kwargs)
     return db_manager
 
 
@@ -287,3 +1720,18 @@ def get_db():
     if db_manager is None:
         db_manager = init_db()
     return db_manager
+
+
+if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Database maintenance commands')
+    parser.add_argument('command', choices=['backfill-stats', 'migrate-url-hash'])
+    args = parser.parse_args()
+    
+    if args.command == 'backfill-stats':
+        count = init_db(create_schema=True).backfill_article_stats()
+        print(f"Backfilled stats for {count} articles")
+    elif args.command == 'migrate-url-hash':
+        init_db(create_schema=True)
+        print("articles.url_hash is up to date")
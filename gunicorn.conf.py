@@ -0,0 +1,65 @@
+"""
+Gunicorn configuration for the article scoring app.
+Loaded automatically by `gunicorn webapp_secure:app` from the project root.
+
+The schema is created once in the master before workers fork, and each
+worker drops any pooled database connections inherited from the master, so
+`GUNICORN_PRELOAD=1` (shared app memory across workers) and threaded
+workers are safe.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+timeout = 120
+preload_app = os.environ.get('GUNICORN_PRELOAD', '').lower() in ('1', 'true', 'yes')
+
+# Workers size their connection pools from these (see database.derive_pool_settings)
+os.environ['WEB_CONCURRENCY'] = str(workers)
+os.environ['GUNICORN_THREADS'] = str(threads)
+
+# Prometheus metrics (PROMETHEUS_METRICS=1): workers write samples to a shared
+# directory that any worker aggregates at /metrics. It must be set before the
+# app imports prometheus_client, and emptied of a previous run's samples.
+if os.environ.get('PROMETHEUS_METRICS', '').lower() in ('1', 'true', 'yes'):
+    metrics_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus_multiproc')
+    os.makedirs(metrics_dir, exist_ok=True)
+    for name in os.listdir(metrics_dir):
+        if name.endswith('.db'):
+            os.remove(os.path.join(metrics_dir, name))
+
+
+def on_starting(server):
+    """Create or migrate the schema once, in the master, before any worker starts"""
+    import database
+
+    if database.db_manager is not None:
+        # Preloaded app: the import already set up the schema in this process
+        db = database.db_manager
+    else:
+        db = database.DatabaseManager(create_schema=True)
+
+    # Workers must not inherit open connections from the master
+    db.engine.dispose()
+    os.environ[database.SCHEMA_READY_ENV] = '1'
+    server.log.info("Database schema ready")
+
+
+def post_fork(server, worker):
+    """Discard database connections inherited from the master"""
+    import database
+
+    if database.db_manager is not None:
+        database.db_manager.dispose_after_fork()
+
+
+def child_exit(server, worker):
+    """Drop an exited worker's live gauges (in-flight requests, pool usage) from /metrics"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        try:
+            from prometheus_client import multiprocess
+        except ImportError:
+            return
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,263 @@
+"""
+Background runner for article imports.
+Parses an upload or Google Sheet and inserts its articles off the request
+thread, committing in chunks and recording progress in the import_jobs
+table so any worker can report on or cancel the job.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+class ImportQueueFull(Exception):
+    """Raised when a worker already has its maximum number of imports pending"""
+
+
+class ImportCancelled(Exception):
+    """Raised inside a job when cancellation has been requested"""
+
+
+class AlreadyImported(Exception):
+    """Raised inside a job whose content matches an earlier completed import"""
+
+    def __init__(self, previous):
+        super().__init__('This content has already been imported')
+        self.previous = previous
+
+
+# Bytes copied at a time when spooling an upload to disk
+SPOOL_BLOCK_SIZE = 1024 * 1024
+
+
+def content_hash(data):
+    """Hash imported content (a sheet's CSV export) for idempotency checks"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def spool_upload(stream, suffix=''):
+    """
+    Copy an uploaded file to a temporary file for a background job to parse
+
+    The copy is hashed on the way, with the same digest as content_hash,
+    so the upload is never held in memory whole. The caller owns the file
+    and removes it once the job is done with it.
+
+    Args:
+        stream: Readable binary stream of the upload
+        suffix: Filename suffix for the temporary file
+
+    Returns:
+        Tuple of (temporary file path, content hash)
+    """
+    digest = hashlib.sha256()
+    fd, path = tempfile.mkstemp(prefix='import-', suffix=suffix)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            while True:
+                block = stream.read(SPOOL_BLOCK_SIZE)
+                if not block:
+                    break
+                digest.update(block)
+                f.write(block)
+    except Exception:
+        os.remove(path)
+        raise
+    return path, digest.hexdigest()
+
+
+class ImportJobRunner:
+    """Run imports on a small per-process thread pool"""
+
+    def __init__(self, db, max_concurrent=1, max_pending=4, chunk_size=500, history_size=200):
+        """
+        Initialize the runner
+
+        Args:
+            db: DatabaseManager the articles and job progress are written to
+            max_concurrent: Imports running at once in this process; the
+                            rest wait, so imports can't crowd out request
+                            threads for CPU and connections
+            max_pending: Running plus waiting imports accepted in this
+                         process before submit() refuses more
+            chunk_size: Articles inserted per transaction
+            history_size: Completed imports remembered by content hash
+        """
+        self.db = db
+        self.max_concurrent = max_concurrent
+        self.max_pending = max_pending
+        self.chunk_size = chunk_size
+        self.history_size = history_size
+
+        # Set by prometheus_metrics.PrometheusMetrics.attach when metrics are on
+        self.metrics = None
+
+        self._executor = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def find_previous_import(self, content_hash):
+        """
+        Get the outcome of an earlier completed import of identical content
+
+        Returns:
+            Dict from DatabaseManager.get_import_history, or None
+        """
+        return self.db.get_import_history(content_hash)
+
+    def submit(self, source, parse, cleanup=None, content_hash=None):
+        """
+        Queue an import
+
+        Args:
+            source: Description of what is imported (filename or sheet URL)
+            parse: Callable run in the background, returning an iterable
+                   of (rows read, list of {'URL', 'Title'} dicts) batches,
+                   so large sources can be parsed incrementally; a
+                   ValueError from it fails the job with its message.
+                   It is passed a content_seen(hash) callback to report
+                   the hash of content it fetched itself, which ends the
+                   job as 'already_imported' if that content was imported
+                   before
+            cleanup: Optional callable run once the job has finished,
+                     whatever the outcome
+            content_hash: Hash of the content, when known up front; the
+                          caller is expected to have checked it already
+
+        Returns:
+            The new job's ID
+
+        Raises:
+            ImportQueueFull: If max_pending imports are already queued or running here
+        """
+        executor = self._get_executor()
+        if not self._slots.acquire(blocking=False):
+            if cleanup:
+                cleanup()
+            raise ImportQueueFull(f'Too many imports in progress (limit {self.max_pending}), try again shortly')
+
+        try:
+            job_id = uuid.uuid4().hex
+            self.db.create_import_job(job_id, source)
+            executor.submit(self._run, job_id, source, parse, cleanup, content_hash)
+        except Exception:
+            self._slots.release()
+            if cleanup:
+                cleanup()
+            raise
+        return job_id
+
+    def _get_executor(self):
+        """Create the thread pool, recreating it in a forked child"""
+        if self._executor is not None and self._pid == os.getpid():
+            return self._executor
+        with self._start_lock:
+            if self._executor is None or self._pid != os.getpid():
+                # Threads don't survive fork(); a child needs its own pool
+                self._pid = os.getpid()
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent,
+                                                    thread_name_prefix='import-job')
+                self._slots = threading.BoundedSemaphore(self.max_pending)
+        return self._executor
+
+    def _run(self, job_id, source, parse, cleanup, content_hash):
+        """Parse and insert one import, recording progress and outcome"""
+        hashes = [content_hash] if content_hash else []
+
+        def content_seen(seen_hash):
+            previous = self.find_previous_import(seen_hash)
+            if previous is not None:
+                raise AlreadyImported(previous)
+            hashes.append(seen_hash)
+
+        started = time.monotonic()
+        progress = {'rows_parsed': 0, 'articles_found': 0, 'processed': 0, 'inserted': 0}
+        status = 'failed'
+
+        try:
+            if self.db.update_import_job(job_id, status='running'):
+                raise ImportCancelled()
+
+            duplicates = []
+
+            def report():
+                if self.db.update_import_job(job_id, duplicate_count=len(duplicates),
+                                             duplicates=duplicates[:10], **progress):
+                    raise ImportCancelled()
+
+            for batch_rows, articles in parse(content_seen):
+                progress['rows_parsed'] += batch_rows
+                progress['articles_found'] += len(articles)
+                if self.metrics is not None:
+                    self.metrics.observe_import_batch(batch_rows, 0)
+                if not articles:
+                    report()
+
+                for start in range(0, len(articles), self.chunk_size):
+                    chunk = articles[start:start + self.chunk_size]
+                    new_count, chunk_duplicates = self.db.insert_articles(chunk)
+
+                    progress['processed'] += len(chunk)
+                    progress['inserted'] += new_count
+                    duplicates.extend(chunk_duplicates)
+                    if self.metrics is not None:
+                        self.metrics.observe_import_batch(0, new_count)
+                    report()
+
+            if not progress['articles_found']:
+                raise ValueError('No URLs detected. Please ensure the source contains valid URLs.')
+
+            self.db.update_import_job(job_id, status='completed', finished_at=datetime.utcnow())
+
+            outcome = dict(progress, duplicate_count=len(duplicates))
+            for seen_hash in hashes:
+                self.db.record_import_history(seen_hash, job_id, source, outcome, self.history_size)
+            status = 'completed'
+
+        except AlreadyImported as e:
+            status = 'already_imported'
+            self.db.update_import_job(job_id, status='already_imported', rows_parsed=e.previous['rows_parsed'],
+                                      articles_found=e.previous['articles_found'],
+                                      error=f"Identical content was already imported by job {e.previous['job_id']}",
+                                      finished_at=datetime.utcnow())
+        except ImportCancelled:
+            status = 'cancelled'
+            self.db.update_import_job(job_id, status='cancelled', finished_at=datetime.utcnow())
+        except ValueError as e:
+            self.db.update_import_job(job_id, status='failed', error=str(e), finished_at=datetime.utcnow())
+        except Exception as e:
+            self.db.update_import_job(job_id, status='failed', error=f'Import failed: {str(e)}',
+                                      finished_at=datetime.utcnow())
+        finally:
+            self._slots.release()
+            if cleanup:
+                cleanup()
+            if self.metrics is not None:
+                self.metrics.observe_import_job(status, progress['rows_parsed'], time.monotonic() - started)
+
+
+def create_import_runner(db):
+    """
+    Factory function to create an ImportJobRunner from environment settings
+
+    IMPORT_MAX_CONCURRENT (default 1) and IMPORT_MAX_PENDING (default 4)
+    bound imports per worker process; IMPORT_CHUNK_SIZE sets the articles
+    committed per transaction and IMPORT_HASH_HISTORY the number of
+    completed imports remembered for idempotency.
+
+    Returns:
+        ImportJobRunner instance
+    """
+    return ImportJobRunner(
+        db,
+        max_concurrent=int(os.environ.get('IMPORT_MAX_CONCURRENT', 1)),
+        max_pending=int(os.environ.get('IMPORT_MAX_PENDING', 4)),
+        chunk_size=int(os.environ.get('IMPORT_CHUNK_SIZE', 500)),
+        history_size=int(os.environ.get('IMPORT_HASH_HISTORY', 200))
+    )
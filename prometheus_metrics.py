@@ -0,0 +1,212 @@
+"""
+Prometheus metrics for the web app.
+Records per-route request latency, in-flight requests, connection pool
+usage, import throughput and export sizes, and renders them at /metrics.
+
+Under gunicorn every worker writes its samples to files in
+PROMETHEUS_MULTIPROC_DIR (prometheus_client's multiprocess mode, set up by
+gunicorn.conf.py), and a scrape of any worker aggregates all of them.
+"""
+
+import os
+import time
+
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+except ImportError:
+    prometheus_client = None
+
+# Request latency buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Per-job import throughput buckets, in rows per second
+IMPORT_RATE_BUCKETS = (10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000)
+
+
+def multiprocess_enabled():
+    """Whether prometheus_client stores samples in a shared directory"""
+    return bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+
+class PrometheusMetrics:
+    """Collect and expose Prometheus metrics for one Flask app"""
+
+    def __init__(self):
+        # Metrics live in a private registry; in multiprocess mode samples
+        # are read back from the shared directory instead
+        self.registry = CollectorRegistry()
+
+        self.requests = Counter(
+            'http_requests_total', 'HTTP requests by route and status',
+            ['method', 'route', 'status'], registry=self.registry
+        )
+        self.latency = Histogram(
+            'http_request_duration_seconds', 'Time until the view returned its response, by route',
+            ['method', 'route'], buckets=LATENCY_BUCKETS, registry=self.registry
+        )
+        self.in_progress = Gauge(
+            'http_requests_in_progress', 'Requests being handled',
+            registry=self.registry, multiprocess_mode='livesum'
+        )
+
+        self.pool_size = Gauge(
+            'db_pool_size', 'Persistent connections the pools may hold',
+            registry=self.registry, multiprocess_mode='livesum'
+        )
+        self.pool_checked_out = Gauge(
+            'db_pool_checked_out', 'Connections currently checked out of the pools',
+            registry=self.registry, multiprocess_mode='livesum'
+        )
+        self.pool_overflow = Gauge(
+            'db_pool_overflow', 'Connections open beyond pool_size (max_overflow headroom in use)',
+            registry=self.registry, multiprocess_mode='livesum'
+        )
+
+        self.import_rows = Counter(
+            'import_rows_total', 'Source rows parsed by article imports',
+            registry=self.registry
+        )
+        self.import_inserted = Counter(
+            'import_articles_inserted_total', 'New articles inserted by imports',
+            registry=self.registry
+        )
+        self.import_jobs = Counter(
+            'import_jobs_total', 'Finished import jobs by outcome',
+            ['status'], registry=self.registry
+        )
+        self.import_rate = Histogram(
+            'import_rows_per_second', 'Rows per second of each finished import job',
+            buckets=IMPORT_RATE_BUCKETS, registry=self.registry
+        )
+
+        self.export_bytes = Counter(
+            'export_bytes_total', 'Bytes sent by export downloads',
+            ['endpoint'], registry=self.registry
+        )
+
+    def init_app(self, app):
+        """Time every request of a Flask app"""
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def attach(self, db, import_runner=None):
+        """Track a DatabaseManager's connection pool and an ImportJobRunner's jobs"""
+        pool = db.engine.pool
+        if isinstance(pool, QueuePool):
+            def update_pool_gauges(checked_out, overflow):
+                self.pool_size.set(pool.size())
+                self.pool_checked_out.set(checked_out)
+                self.pool_overflow.set(max(overflow, 0))
+
+            def on_checkout(*args):
+                update_pool_gauges(pool.checkedout(), pool.overflow())
+
+            def on_checkin(*args):
+                # Fires before the connection is back in the pool: it is
+                # still counted as checked out, and when the pool is full it
+                # is about to be closed, releasing an overflow slot
+                overflow = pool.overflow()
+                if pool.size() and pool.checkedin() >= pool.size():
+                    overflow -= 1
+                update_pool_gauges(pool.checkedout() - 1, overflow)
+
+            # Updated as connections move, so scrapes of other workers see
+            # this worker's latest values without asking it
+            event.listen(pool, 'checkout', on_checkout)
+            event.listen(pool, 'checkin', on_checkin)
+
+        if import_runner is not None:
+            import_runner.metrics = self
+
+    def _before_request(self):
+        g.metrics_start = time.perf_counter()
+        self.in_progress.inc()
+
+    def _after_request(self, response):
+        start = g.get('metrics_start')
+        if start is None:
+            return response
+
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        self.latency.labels(request.method, route).observe(time.perf_counter() - start)
+        self.requests.labels(request.method, route, str(response.status_code)).inc()
+
+        if response.status_code == 200 and request.endpoint and request.endpoint.startswith('export_'):
+            self._count_export_bytes(response, request.endpoint)
+        return response
+
+    def _teardown_request(self, exc):
+        # Contexts that never ran before_request (e.g. test sessions) aren't counted
+        if g.pop('metrics_start', None) is not None:
+            self.in_progress.dec()
+
+    def _count_export_bytes(self, response, endpoint):
+        """Count an export's body, as it is sent when the response is streamed"""
+        counter = self.export_bytes.labels(endpoint)
+        if not response.is_streamed:
+            counter.inc(response.calculate_content_length() or 0)
+            return
+
+        chunks = response.response
+
+        def counted():
+            for chunk in chunks:
+                counter.inc(len(chunk))
+                yield chunk
+
+        response.response = counted()
+
+    def observe_import_batch(self, rows, inserted):
+        """Record rows parsed and articles inserted by one import batch"""
+        self.import_rows.inc(rows)
+        self.import_inserted.inc(inserted)
+
+    def observe_import_job(self, status, rows, seconds):
+        """Record a finished import job's outcome and throughput"""
+        self.import_jobs.labels(status).inc()
+        if rows and seconds > 0:
+            self.import_rate.observe(rows / seconds)
+
+    def render(self):
+        """
+        Render all metrics in the Prometheus text format
+
+        Returns:
+            Tuple of (body bytes, content type)
+        """
+        if multiprocess_enabled():
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = self.registry
+        return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
+
+
+def create_prometheus_metrics(app, db, import_runner=None):
+    """
+    Factory function to install PrometheusMetrics on a Flask app from environment settings
+
+    Metrics are off unless PROMETHEUS_METRICS is set to 1/true and the
+    prometheus_client package is installed. Under gunicorn,
+    gunicorn.conf.py points PROMETHEUS_MULTIPROC_DIR at a shared directory
+    so all workers' samples are aggregated.
+
+    Returns:
+        PrometheusMetrics instance, or None when disabled
+    """
+    if os.environ.get('PROMETHEUS_METRICS', '').lower() not in ('1', 'true', 'yes'):
+        return None
+    if prometheus_client is None:
+        app.logger.warning('PROMETHEUS_METRICS is set but prometheus_client is not installed')
+        return None
+
+    metrics = PrometheusMetrics()
+    metrics.init_app(app)
+    metrics.attach(db, import_runner)
+    return metrics
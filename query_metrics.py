@@ -0,0 +1,163 @@
+"""
+SQL query instrumentation for DatabaseManager.
+Hooks SQLAlchemy engine events to time every statement, attributes it to the
+DatabaseManager method that issued it, and logs statements over a threshold.
+"""
+
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import event
+
+logger = logging.getLogger('database.slow_queries')
+
+
+class QueryMetrics:
+    """Per-method statement counts, latency and rows written for one DatabaseManager"""
+
+    def __init__(self, slow_query_ms=200):
+        """
+        Initialize metrics
+
+        Args:
+            slow_query_ms: Statements taking at least this long are logged
+                           with their parameters
+        """
+        self.slow_query_seconds = slow_query_ms / 1000.0
+        self._current_method = contextvars.ContextVar('db_method', default=None)
+        self._lock = threading.Lock()
+        self._by_method = {}
+
+    def attach(self, db):
+        """Instrument a DatabaseManager's engine and public methods"""
+        event.listen(db.engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(db.engine, 'after_cursor_execute', self._after_cursor_execute)
+
+        # Wrap public methods so statements know which method issued them
+        for name in dir(type(db)):
+            if name.startswith('_'):
+                continue
+            method = getattr(db, name)
+            if callable(method) and hasattr(type(db), name) and callable(getattr(type(db), name)):
+                setattr(db, name, self._track_method(name, method))
+
+        db.query_metrics = self
+
+    def _track_method(self, name, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            token = self._current_method.set(name)
+            try:
+                result = method(*args, **kwargs)
+            finally:
+                self._current_method.reset(token)
+            if inspect.isgenerator(result):
+                return self._track_generator(name, result)
+            return result
+        return wrapper
+
+    def _track_generator(self, name, generator):
+        """
+        Attribute statements run while a generator method's result is consumed
+
+        Streaming methods run their queries lazily, after the method call
+        returned (e.g. while a response body is sent), so each step resumes
+        the generator with the method name set again.
+        """
+        try:
+            while True:
+                token = self._current_method.set(name)
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    return
+                finally:
+                    self._current_method.reset(token)
+                yield item
+        finally:
+            generator.close()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, '_query_start', None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+
+        # Rows are counted for INSERT/UPDATE/DELETE only: drivers don't
+        # report a rowcount for SELECTs consistently (SQLite gives -1)
+        rows = 0
+        if context.isinsert or context.isupdate or context.isdelete:
+            rows = max(cursor.rowcount or 0, 0)
+        method = self._current_method.get() or '(other)'
+        slow = elapsed >= self.slow_query_seconds
+
+        with self._lock:
+            m = self._by_method.get(method)
+            if m is None:
+                m = self._by_method[method] = {
+                    'statements': 0, 'total_seconds': 0.0, 'max_seconds': 0.0, 'rows_written': 0, 'slow': 0
+                }
+            m['statements'] += 1
+            m['total_seconds'] += elapsed
+            m['max_seconds'] = max(m['max_seconds'], elapsed)
+            m['rows_written'] += rows
+            m['slow'] += slow
+
+        if slow:
+            logger.warning(
+                'Slow query (%.1f ms) in DatabaseManager.%s: %s | params=%.500r',
+                elapsed * 1000, method, ' '.join(statement.split()), parameters
+            )
+
+    def get_metrics(self):
+        """Get aggregated statement metrics per DatabaseManager method"""
+        with self._lock:
+            by_method = {name: dict(m) for name, m in self._by_method.items()}
+
+        methods = {}
+        for name, m in sorted(by_method.items()):
+            methods[name] = {
+                'statements': m['statements'],
+                'total_ms': round(m['total_seconds'] * 1000, 3),
+                'avg_ms': round(m['total_seconds'] * 1000 / m['statements'], 3),
+                'max_ms': round(m['max_seconds'] * 1000, 3),
+                'rows_written': m['rows_written'],
+                'slow': m['slow']
+            }
+
+        return {
+            'slow_query_ms': self.slow_query_seconds * 1000,
+            'methods': methods
+        }
+
+    def reset(self):
+        """Clear the aggregated metrics"""
+        with self._lock:
+            self._by_method.clear()
+
+
+def create_query_metrics(db):
+    """
+    Factory function to instrument a DatabaseManager from environment settings
+
+    Instrumentation is off unless DB_QUERY_METRICS is set to 1/true.
+    DB_SLOW_QUERY_MS sets the slow-query log threshold.
+
+    Returns:
+        QueryMetrics instance, or None when disabled
+    """
+    if os.environ.get('DB_QUERY_METRICS', '').lower() not in ('1', 'true', 'yes'):
+        return None
+
+    metrics = QueryMetrics(slow_query_ms=float(os.environ.get('DB_SLOW_QUERY_MS', 200)))
+    metrics.attach(db)
+    return metrics
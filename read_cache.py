@@ -0,0 +1,108 @@
+"""
+In-process cache for expensive DatabaseManager read models.
+Entries are tagged with the database's data version when computed and are
+served only while that version is still current and their TTL hasn't
+expired, so writes made by any gunicorn worker invalidate every worker's
+copy at the cost of one single-row version read.
+"""
+
+import os
+import threading
+import time
+
+
+class ReadCache:
+    """Version-checked, TTL-bounded cache of read results for one DatabaseManager"""
+
+    def __init__(self, ttl_seconds=30):
+        """
+        Initialize the cache
+
+        Args:
+            ttl_seconds: Longest time an entry is served, even if the data
+                         version hasn't changed
+        """
+        self.ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._metrics = {
+            'hits': 0,
+            'misses': 0,
+            'stale': 0,
+            'expired': 0,
+            'invalidations': 0
+        }
+
+    def attach(self, db):
+        """Make a DatabaseManager consult this cache for its cached reads"""
+        db.read_cache = self
+
+    def get_or_compute(self, key, version, compute):
+        """
+        Return the cached value for key, computing and storing it on a miss
+
+        Cached values are shared between callers and must not be mutated.
+
+        Args:
+            key: Cache key
+            version: Current data version; entries computed at any other
+                     version are recomputed
+            compute: Zero-argument callable producing the value
+
+        Returns:
+            The cached or freshly computed value
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_version, stored_at, value = entry
+                if entry_version == version and now - stored_at < self.ttl:
+                    self._metrics['hits'] += 1
+                    return value
+                self._metrics['stale' if entry_version != version else 'expired'] += 1
+            self._metrics['misses'] += 1
+
+        value = compute()
+
+        with self._lock:
+            current = self._entries.get(key)
+            # Don't let a slow computation overwrite a newer entry
+            if current is None or current[0] <= version:
+                self._entries[key] = (version, now, value)
+        return value
+
+    def invalidate(self):
+        """Drop every entry, after a write made through this process"""
+        with self._lock:
+            self._entries.clear()
+            self._metrics['invalidations'] += 1
+
+    def get_metrics(self):
+        """Get hit/miss counters for this process"""
+        with self._lock:
+            m = dict(self._metrics)
+            m['entries'] = len(self._entries)
+
+        lookups = m['hits'] + m['misses']
+        m['hit_rate'] = m['hits'] / lookups if lookups else 0
+        m['ttl_seconds'] = self.ttl
+        return m
+
+
+def create_read_cache(db):
+    """
+    Factory function to attach a ReadCache to a DatabaseManager from environment settings
+
+    Caching is off unless DB_READ_CACHE is set to 1/true.
+    DB_READ_CACHE_TTL_SECONDS bounds how long an entry is served.
+
+    Returns:
+        ReadCache instance, or None when disabled
+    """
+    if os.environ.get('DB_READ_CACHE', '').lower() not in ('1', 'true', 'yes'):
+        return None
+
+    cache = ReadCache(ttl_seconds=float(os.environ.get('DB_READ_CACHE_TTL_SECONDS', 30)))
+    cache.attach(db)
+    return cache
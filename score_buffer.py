@@ -0,0 +1,164 @@
+"""
+Write-behind buffer for score submissions.
+Queues validated scores in-process and commits them in groups from a
+background thread, so concurrent submissions share one transaction (and one
+fsync) instead of committing individually.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class ScoreWriteBuffer:
+    """Group-commit scores through DatabaseManager.add_scores_bulk"""
+
+    def __init__(self, db, flush_interval_ms=20, batch_size=100):
+        """
+        Initialize the buffer
+
+        Args:
+            db: DatabaseManager used for the group commits
+            flush_interval_ms: Longest time a queued score waits for more
+                               scores before its group is committed
+            batch_size: Commit as soon as this many scores are queued
+        """
+        self.db = db
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.batch_size = batch_size
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            'groups_committed': 0,
+            'scores_committed': 0,
+            'scores_failed': 0,
+            'commit_errors': 0,
+            'max_group_size': 0,
+            'total_commit_seconds': 0.0,
+            'max_commit_seconds': 0.0
+        }
+
+    def submit(self, url, score_data):
+        """
+        Queue a score for the next group commit
+
+        Returns:
+            Future resolving to the add_scores_bulk result dict for this
+            score once its group has committed
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((url, score_data, future))
+        return future
+
+    def add_score(self, url, score_data, timeout=30):
+        """
+        Queue a score and block until its group commits
+
+        Raises:
+            RuntimeError: If the score could not be saved
+        """
+        result = self.submit(url, score_data).result(timeout=timeout)
+        if not result['success']:
+            raise RuntimeError(result['error'])
+
+    def _ensure_started(self):
+        """Start the flusher thread, restarting it in a forked child"""
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is None or self._pid != os.getpid():
+                # Threads don't survive fork(); a child inherits the object
+                # but not the flusher, and must not share the parent's queue
+                if self._pid is not None and self._pid != os.getpid():
+                    self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='score-flusher', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """Flusher loop: collect a group, then commit it"""
+        while True:
+            group = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+
+            while len(group) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    group.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._commit(group)
+
+    def _commit(self, group):
+        """Commit one group and resolve its futures"""
+        start = time.perf_counter()
+        try:
+            results = self.db.add_scores_bulk([(url, score_data) for url, score_data, _ in group])
+        except Exception as e:
+            with self._metrics_lock:
+                self._metrics['commit_errors'] += 1
+                self._metrics['scores_failed'] += len(group)
+            for _, _, future in group:
+                future.set_exception(e)
+            return
+
+        elapsed = time.perf_counter() - start
+        failed = sum(1 for result in results if not result['success'])
+
+        with self._metrics_lock:
+            m = self._metrics
+            m['groups_committed'] += 1
+            m['scores_committed'] += len(group) - failed
+            m['scores_failed'] += failed
+            m['max_group_size'] = max(m['max_group_size'], len(group))
+            m['total_commit_seconds'] += elapsed
+            m['max_commit_seconds'] = max(m['max_commit_seconds'], elapsed)
+
+        for (_, _, future), result in zip(group, results):
+            future.set_result(result)
+
+    def get_metrics(self):
+        """Get group size and commit latency metrics for this process"""
+        with self._metrics_lock:
+            m = dict(self._metrics)
+
+        groups = m['groups_committed']
+        m['avg_group_size'] = (m['scores_committed'] + m['scores_failed']) / groups if groups else 0
+        m['avg_commit_ms'] = m['total_commit_seconds'] * 1000 / groups if groups else 0
+        m['max_commit_ms'] = m.pop('max_commit_seconds') * 1000
+        m.pop('total_commit_seconds')
+        m['queued'] = self._queue.qsize()
+        m['flush_interval_ms'] = self.flush_interval * 1000
+        m['batch_size'] = self.batch_size
+        return m
+
+
+def create_score_buffer(db):
+    """
+    Factory function to create a ScoreWriteBuffer from environment settings
+
+    Write-behind is off unless SCORE_WRITE_BEHIND is set to 1/true.
+    SCORE_FLUSH_INTERVAL_MS and SCORE_FLUSH_BATCH_SIZE tune the grouping.
+
+    Returns:
+        ScoreWriteBuffer instance, or None when disabled
+    """
+    if os.environ.get('SCORE_WRITE_BEHIND', '').lower() not in ('1', 'true', 'yes'):
+        return None
+
+    return ScoreWriteBuffer(
+        db,
+        flush_interval_ms=int(os.environ.get('SCORE_FLUSH_INTERVAL_MS', 20)),
+        batch_size=int(os.environ.get('SCORE_FLUSH_BATCH_SIZE', 100))
+    )
@@ -0,0 +1,94 @@
+"""
+Request coalescing for expensive DatabaseManager reads.
+Concurrent callers asking for the same read at the same data version share
+one in-flight computation instead of each running the full query.
+"""
+
+import os
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Run at most one computation per key at a time, sharing its result with concurrent callers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._metrics = {
+            'calls': 0,
+            'executions': 0,
+            'coalesced': 0
+        }
+
+    def attach(self, db):
+        """Make a DatabaseManager coalesce its shared reads through this instance"""
+        db.single_flight = self
+
+    def do(self, key, compute):
+        """
+        Return compute()'s result, joining an identical call already in flight
+
+        The key must capture everything the result depends on (for
+        DatabaseManager reads, the data version), so a caller never joins a
+        computation that started before a write it has already seen.
+        Results are shared between callers and must not be mutated.
+
+        Args:
+            key: Hashable identity of the computation
+            compute: Zero-argument callable
+
+        Returns:
+            compute()'s return value
+
+        Raises:
+            Whatever compute() raised, in every caller that joined it
+        """
+        with self._lock:
+            self._metrics['calls'] += 1
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+                self._metrics['executions'] += 1
+            else:
+                self._metrics['coalesced'] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = compute()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def get_metrics(self):
+        """Get call and coalescing counters for this process"""
+        with self._lock:
+            m = dict(self._metrics)
+            m['in_flight'] = len(self._in_flight)
+        return m
+
+
+def create_single_flight(db):
+    """
+    Factory function to attach a SingleFlight to a DatabaseManager from environment settings
+
+    Coalescing is off unless DB_COALESCE_READS is set to 1/true.
+
+    Returns:
+        SingleFlight instance, or None when disabled
+    """
+    if os.environ.get('DB_COALESCE_READS', '').lower() not in ('1', 'true', 'yes'):
+        return None
+
+    single_flight = SingleFlight()
+    single_flight.attach(db)
+    return single_flight
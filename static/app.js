@@ -1,13 +1,39 @@
 // Global state
 let articles = [];
-let scoresData = {};
+// Score count and average per article URL, precomputed by the server
+let articleStats = {};
+// Global statistics from the bootstrap call
+let statistics = null;
+// Position for /api/changes, so refreshes only fetch what is new
+let changesCursor = null;
 let currentArticleUrl = null;
+let currentImportJob = null;
+// Server-sent live update stream, when the server has them enabled
+let liveUpdates = null;
+let renderPending = false;
+// Number of article cards currently in the list, so pages can be appended
+let renderedCount = 0;
+
+// Page size for incremental list loading (server caps it as well)
+const PAGE_SIZE = 500;
+
+// Longest a client waits on one background import before giving up
+const IMPORT_MAX_WAIT_MS = 30 * 60 * 1000;
+
+// Last ETag and body per GET URL, so unchanged data comes back as a bodiless 304
+const responseCache = new Map();
 
 // Initialize app
 document.addEventListener('DOMContentLoaded', () => {
     initializeEventListeners();
     loadArticles();
-    loadScores();
+
+    // Without live updates, pick up colleagues' changes when the tab is revisited
+    document.addEventListener('visibilitychange', () => {
+        if (document.visibilityState === 'visible' && !liveUpdates) {
+            syncChanges();
+        }
+    });
 });
 
 function initializeEventListeners() {
@@ -16,6 +42,13 @@ function initializeEventListeners() {
         showModal('importModal');
     });
 
+    // Cancel a running background import
+    document.getElementById('cancelImportBtn').addEventListener('click', async () => {
+        if (currentImportJob) {
+            await fetch(`/api/import/jobs/${currentImportJob}/cancel`, { method: 'POST' });
+        }
+    });
+
     // Export button
     document.getElementById('exportBtn').addEventListener('click', () => {
         showModal('exportModal');
@@ -125,20 +158,209 @@ function hideModal(modalId) {
 
 async function loadArticles() {
     try {
-        const response = await fetch('/api/articles');
-        if (response.ok) {
-            const result = await response.json();
-            articles = result.articles;
+        const loaded = [];
+        const loadedStats = {};
+        let cursor = null;
+        let total = 0;
+
+        // Fetch pages until the server stops returning a cursor,
+        // appending each page's cards as it arrives. Each article comes
+        // with its score count and average, so no raw scores are downloaded.
+        do {
+            const params = new URLSearchParams({ limit: PAGE_SIZE });
+            if (cursor) params.set('cursor', cursor);
+
+            const { ok, data: result } = await getJSON(`/api/bootstrap?${params}`);
+            if (!ok) break;
+
+            if (!cursor) {
+                total = result.total_count;
+                statistics = { ...result.statistics };
+                changesCursor = result.changes_cursor;
+                if (result.live_updates && !liveUpdates) connectLiveUpdates();
+            }
+
+            for (const article of result.articles) {
+                loadedStats[article.URL] = { average: article.average, count: article.count };
+            }
+            const firstPage = loaded.length === 0;
+            loaded.push(...result.articles);
+            articles = loaded;
+            articleStats = loadedStats;
+            cursor = result.next_cursor;
+
             if (articles.length > 0) {
-                setStatus(`${result.count} article${result.count !== 1 ? 's' : ''} in database`);
-                renderArticles();
+                setStatus(cursor
+                    ? `Loading articles... ${articles.length} of ~${total}`
+                    : `${articles.length} article${articles.length !== 1 ? 's' : ''} in database`);
+                if (firstPage) {
+                    renderArticles();
+                } else {
+                    appendArticles(result.articles);
+                }
             }
-        }
+        } while (cursor);
     } catch (error) {
         console.error('Failed to load articles:', error);
     }
 }
 
+// Fetch only the articles and scores added since the last load or sync
+async function syncChanges() {
+    if (!changesCursor) {
+        await loadArticles();
+        return;
+    }
+
+    try {
+        let more = true;
+        while (more) {
+            const params = new URLSearchParams({ since: changesCursor });
+            const response = await fetch(`/api/changes?${params}`, { cache: 'no-store' });
+            if (!response.ok) {
+                await loadArticles();
+                return;
+            }
+
+            const changes = await response.json();
+            applyChanges(changes);
+            changesCursor = changes.next_cursor;
+            more = changes.has_more;
+        }
+    } catch (error) {
+        console.error('Failed to sync changes:', error);
+    }
+}
+
+function applyChanges(changes) {
+    // Articles written while the list loaded, or already pushed live, come
+    // back here too, so skip articles already listed
+    const known = new Set(articles.map(a => a.URL));
+    const added = changes.articles.filter(a => !known.has(a.URL));
+    for (const article of added) {
+        articleStats[article.URL] = { average: article.average, count: article.count };
+    }
+    articles.unshift(...added.reverse());
+
+    for (const [url, stats] of Object.entries(changes.article_stats)) {
+        updateArticleStats(url, stats);
+    }
+    if (changes.statistics) {
+        statistics = { ...changes.statistics };
+    }
+
+    if (added.length || Object.keys(changes.article_stats).length) {
+        setStatus(`${articles.length} article${articles.length !== 1 ? 's' : ''} in database`);
+        scheduleRender();
+    }
+}
+
+// Subscribe to colleagues' scores and imports, patching local state as they arrive
+function connectLiveUpdates() {
+    if (!window.EventSource) return;
+
+    liveUpdates = new EventSource('/api/events');
+    liveUpdates.addEventListener('score_added', (e) => applyScoreAdded(JSON.parse(e.data)));
+    liveUpdates.addEventListener('articles_imported', (e) => applyArticlesImported(JSON.parse(e.data)));
+    liveUpdates.addEventListener('resync', () => syncChanges());
+    liveUpdates.onerror = () => {
+        // EventSource reconnects by itself unless the server refused the stream
+        if (liveUpdates.readyState === EventSource.CLOSED) {
+            liveUpdates = null;
+            setTimeout(connectLiveUpdates, 30000);
+        }
+    };
+}
+
+function applyScoreAdded(event) {
+    if (!articleStats[event.url] && !articles.some(a => a.URL === event.url)) {
+        articles.unshift({ URL: event.url, Title: event.title });
+        if (statistics) {
+            statistics.total_articles += 1;
+            statistics.articles_without_scores += 1;
+        }
+    }
+    updateArticleStats(event.url, { average: event.average, count: event.count });
+    scheduleRender();
+}
+
+function applyArticlesImported(event) {
+    if (!event.articles) {
+        // Too many to list in the event
+        syncChanges();
+        return;
+    }
+
+    const known = new Set(articles.map(a => a.URL));
+    const added = event.articles.filter(a => !known.has(a.URL));
+    articles.unshift(...added.reverse());
+    if (statistics) {
+        statistics.total_articles += added.length;
+        statistics.articles_without_scores += added.length;
+    }
+    scheduleRender();
+}
+
+// Batch re-renders when many events arrive together
+function scheduleRender() {
+    if (renderPending) return;
+    renderPending = true;
+    requestAnimationFrame(() => {
+        renderPending = false;
+        renderArticles();
+    });
+}
+
+// GET a JSON endpoint, revalidating any earlier response with If-None-Match
+async function getJSON(url) {
+    const cached = responseCache.get(url);
+    const headers = cached ? { 'If-None-Match': cached.etag } : {};
+
+    // The cache here replaces the browser's, so a 304 always reaches this code
+    const response = await fetch(url, { headers, cache: 'no-store' });
+    if (response.status === 304 && cached) {
+        return { ok: true, data: cached.data };
+    }
+
+    const data = await response.json();
+    const etag = response.headers.get('ETag');
+    if (response.ok && etag) {
+        responseCache.set(url, { etag, data });
+    }
+    return { ok: response.ok, data };
+}
+
+// Poll a background import job until it finishes, showing its progress
+async function waitForImport(jobId) {
+    const progressText = document.getElementById('uploadProgressText');
+    currentImportJob = jobId;
+    const deadline = Date.now() + IMPORT_MAX_WAIT_MS;
+    try {
+        while (true) {
+            if (Date.now() > deadline) {
+                throw new Error('The import is taking too long to finish. It may still complete - reload the page later to check.');
+            }
+
+            const response = await fetch(`/api/import/jobs/${jobId}`, { cache: 'no-store' });
+            const job = await response.json();
+            if (!response.ok) {
+                throw new Error(job.error);
+            }
+            if (['completed', 'failed', 'cancelled', 'already_imported'].includes(job.status)) {
+                return job;
+            }
+
+            progressText.textContent = job.articles_found
+                ? `Importing... ${job.processed} of ${job.articles_found} articles (${job.inserted} new)`
+                : 'Uploading and processing...';
+            await new Promise(resolve => setTimeout(resolve, 1000));
+        }
+    } finally {
+        currentImportJob = null;
+        progressText.textContent = 'Uploading and processing...';
+    }
+}
+
 async function handleFileSelect() {
     const fileInput = document.getElementById('fileInput');
     const file = fileInput.files[0];
@@ -160,28 +382,39 @@ async function handleFileSelect() {
 
         const result = await response.json();
 
-        if (response.ok) {
-            articles = result.articles;
-            
-            // Build status message
-            let statusMsg = `Import complete: ${result.total_count} total articles`;
-            if (result.new_count > 0) {
-                statusMsg += ` (${result.new_count} new)`;
-            }
-            if (result.duplicate_count > 0) {
-                statusMsg += ` - ${result.duplicate_count} duplicates removed`;
-            }
-            
-            setStatus(statusMsg);
-            
-            // Show detailed feedback if duplicates found
-            if (result.duplicate_count > 0 && result.duplicates.length > 0) {
-                const dupList = result.duplicates.join(', ');
-                console.log('Duplicate articles removed:', dupList);
-            }
-            
-            renderArticles();
+        if (response.ok && result.already_imported) {
+            setStatus(`This file was already imported on ${new Date(result.previous_import.completed_at).toLocaleString()} - nothing to do`);
             hideModal('importModal');
+        } else if (response.ok) {
+            const job = await waitForImport(result.job_id);
+
+            if (job.status === 'completed') {
+                await syncChanges();
+
+                // Build status message
+                let statusMsg = `Import complete: ${articles.length} total articles`;
+                if (job.inserted > 0) {
+                    statusMsg += ` (${job.inserted} new)`;
+                }
+                if (job.duplicate_count > 0) {
+                    statusMsg += ` - ${job.duplicate_count} duplicates removed`;
+                }
+                
+                setStatus(statusMsg);
+                
+                // Show detailed feedback if duplicates found
+                if (job.duplicate_count > 0 && job.duplicates.length > 0) {
+                    const dupList = job.duplicates.join(', ');
+                    console.log('Duplicate articles removed:', dupList);
+                }
+                
+                hideModal('importModal');
+            } else if (job.status === 'cancelled') {
+                await syncChanges();
+                setStatus(`Import cancelled after ${job.inserted} new articles`);
+            } else {
+                alert(`Error: ${job.error}`);
+            }
         } else {
             alert(`Error: ${result.error}`);
         }
@@ -195,20 +428,9 @@ async function handleFileSelect() {
     }
 }
 
-async function loadScores() {
-    try {
-        const response = await fetch('/api/scores');
-        scoresData = await response.json();
-        if (articles.length > 0) {
-            renderArticles();
-        }
-    } catch (error) {
-        console.error('Failed to load scores:', error);
-    }
-}
-
 function renderArticles() {
     const container = document.getElementById('articlesContainer');
+    renderedCount = 0;
     
     if (articles.length === 0) {
         container.innerHTML = `
@@ -222,10 +444,46 @@ function renderArticles() {
         return;
     }
 
+    const filteredArticles = articles.filter(articleMatchesFilters());
+
+    if (filteredArticles.length === 0) {
+        container.innerHTML = `
+            <div class="empty-state">
+                <div class="empty-icon">🔍</div>
+                <h2>No Articles Found</h2>
+                <p>Try adjusting your search or filter criteria</p>
+            </div>
+        `;
+        return;
+    }
+
+    container.innerHTML = filteredArticles.map(renderArticleCard).join('');
+    renderedCount = filteredArticles.length;
+}
+
+// Add cards for articles appended to the end of the list, leaving the
+// cards already rendered in place
+function appendArticles(added) {
+    if (renderedCount === 0) {
+        // The list shows an empty state, which the new cards replace
+        renderArticles();
+        return;
+    }
+
+    const filteredArticles = added.filter(articleMatchesFilters());
+    if (filteredArticles.length === 0) return;
+
+    const html = filteredArticles.map((article, index) => renderArticleCard(article, renderedCount + index)).join('');
+    document.getElementById('articlesContainer').insertAdjacentHTML('beforeend', html);
+    renderedCount += filteredArticles.length;
+}
+
+// Build a predicate for the current search term and score filter
+function articleMatchesFilters() {
     const searchTerm = document.getElementById('searchInput').value.toLowerCase();
     const filterRange = document.getElementById('filterSelect').value;
 
-    const filteredArticles = articles.filter(article => {
+    return article => {
         // Search filter
         if (searchTerm) {
             const matchesSearch = 
@@ -245,51 +503,40 @@ function renderArticles() {
         if (filterRange === '9-10' && (avgScore < 9 || avgScore > 10)) return false;
 
         return true;
-    });
-
-    if (filteredArticles.length === 0) {
-        container.innerHTML = `
-            <div class="empty-state">
-                <div class="empty-icon">🔍</div>
-                <h2>No Articles Found</h2>
-                <p>Try adjusting your search or filter criteria</p>
-            </div>
-        `;
-        return;
-    }
+    };
+}
 
-    container.innerHTML = filteredArticles.map((article, index) => {
-        const stats = getArticleStats(article.URL);
-        const scoreClass = getScoreClass(stats.average);
-        const scoreDisplay = stats.average > 0 ? stats.average.toFixed(1) : '-';
-
-        return `
-            <div class="article-card" data-url="${escapeHtml(article.URL)}">
-                <div class="article-header">
-                    <div class="article-number">#${index + 1}</div>
-                    <div class="article-main">
-                        <div class="article-title">${escapeHtml(article.Title)}</div>
-                        <div class="article-url">${escapeHtml(article.URL)}</div>
-                    </div>
-                    <div class="article-score">
-                        <span class="score-badge ${scoreClass}">${scoreDisplay}</span>
-                        <div class="peer-count">${stats.count} ${stats.count === 1 ? 'score' : 'scores'}</div>
-                    </div>
+function renderArticleCard(article, index) {
+    const stats = getArticleStats(article.URL);
+    const scoreClass = getScoreClass(stats.average);
+    const scoreDisplay = stats.average > 0 ? stats.average.toFixed(1) : '-';
+
+    return `
+        <div class="article-card" data-url="${escapeHtml(article.URL)}">
+            <div class="article-header">
+                <div class="article-number">#${index + 1}</div>
+                <div class="article-main">
+                    <div class="article-title">${escapeHtml(article.Title)}</div>
+                    <div class="article-url">${escapeHtml(article.URL)}</div>
                 </div>
-                <div class="article-actions">
-                    <button class="btn btn-primary btn-small" onclick="openScoringModal('${escapeHtml(article.URL)}', '${escapeHtml(article.Title)}')">
-                        📝 Score Article
-                    </button>
-                    <button class="btn btn-secondary btn-small" onclick="openArticle('${escapeHtml(article.URL)}')">
-                        🔗 Visit Article
-                    </button>
-                    <button class="btn btn-secondary btn-small" onclick="viewPeerScores('${escapeHtml(article.URL)}', '${escapeHtml(article.Title)}')">
-                        📊 Peer Scores (${stats.count})
-                    </button>
+                <div class="article-score">
+                    <span class="score-badge ${scoreClass}">${scoreDisplay}</span>
+                    <div class="peer-count">${stats.count} ${stats.count === 1 ? 'score' : 'scores'}</div>
                 </div>
             </div>
-        `;
-    }).join('');
+            <div class="article-actions">
+                <button class="btn btn-primary btn-small" onclick="openScoringModal('${escapeHtml(article.URL)}', '${escapeHtml(article.Title)}')">
+                    📝 Score Article
+                </button>
+                <button class="btn btn-secondary btn-small" onclick="openArticle('${escapeHtml(article.URL)}')">
+                    🔗 Visit Article
+                </button>
+                <button class="btn btn-secondary btn-small" onclick="viewPeerScores('${escapeHtml(article.URL)}', '${escapeHtml(article.Title)}')">
+                    📊 Peer Scores (${stats.count})
+                </button>
+            </div>
+        </div>
+    `;
 }
 
 function filterArticles() {
@@ -297,19 +544,32 @@ function filterArticles() {
 }
 
 function getArticleStats(url) {
-    const scores = scoresData[url] || [];
-    
-    if (scores.length === 0) {
-        return { average: 0, count: 0 };
-    }
+    return articleStats[url] || { average: 0, count: 0 };
+}
+
+// Refresh one article's count and average (and the global statistics)
+// after a score was added, instead of reloading the whole list
+async function refreshArticleStats(url) {
+    const { ok, data } = await getJSON(`/api/scores/${encodeURIComponent(url)}`);
+    if (!ok) return;
 
-    const categories = ['accuracy', 'credibility', 'citation', 'reasoning', 'confidence'];
-    const total = scores.reduce((sum, score) => {
-        return sum + categories.reduce((catSum, cat) => catSum + (score[cat] || 0), 0);
-    }, 0);
+    updateArticleStats(url, { average: data.overall_average, count: data.count });
+}
 
-    const average = total / (scores.length * categories.length);
-    return { average, count: scores.length };
+// Store an article's new aggregates and adjust the global statistics to match
+function updateArticleStats(url, stats) {
+    const previous = getArticleStats(url);
+    // Events and refreshes can arrive in either order; never go backwards
+    if (stats.count < previous.count) return;
+    articleStats[url] = stats;
+
+    if (statistics) {
+        statistics.total_scores += stats.count - previous.count;
+        if (previous.count === 0 && stats.count > 0) {
+            statistics.articles_with_scores += 1;
+            statistics.articles_without_scores -= 1;
+        }
+    }
 }
 
 function getScoreClass(score) {
@@ -348,8 +608,7 @@ async function viewPeerScores(url, title) {
     document.getElementById('peerArticleUrl').href = url;
     
     try {
-        const response = await fetch(`/api/scores/${encodeURIComponent(url)}`);
-        const data = await response.json();
+        const { data } = await getJSON(`/api/scores/${encodeURIComponent(url)}`);
         
         const content = document.getElementById('peerScoresContent');
         
@@ -447,7 +706,7 @@ async function submitScore() {
 
         if (response.ok) {
             setStatus('Score submitted successfully!');
-            await loadScores();
+            await refreshArticleStats(currentArticleUrl);
             renderArticles();
             hideModal('scoringModal');
         } else {
@@ -472,6 +731,10 @@ async function performExport() {
         params.includeNotes = document.getElementById('includeNotes').checked;
     }
     
+    if (exportFormat === 'ndjson') {
+        params.format = 'ndjson';
+    }
+    
     if (exportFormat === 'urls') {
         const onlyScoredEl = document.getElementById('onlyScored');
         const includeStatsEl = document.getElementById('includeStats');
@@ -483,7 +746,7 @@ async function performExport() {
         let endpoint;
         if (exportFormat === 'txt') {
             endpoint = '/api/export/txt';
-        } else if (exportFormat === 'json') {
+        } else if (exportFormat === 'json' || exportFormat === 'ndjson') {
             endpoint = '/api/export/json';
         } else {
             endpoint = '/api/export/urls';
@@ -511,6 +774,7 @@ async function performExport() {
             } else {
                 if (exportFormat === 'txt') filename = 'export.zip';
                 else if (exportFormat === 'json') filename = 'export.json';
+                else if (exportFormat === 'ndjson') filename = 'export.ndjson';
                 else filename = 'urls.txt';
             }
             
@@ -534,8 +798,8 @@ async function performExport() {
 
 async function showStatistics() {
     try {
-        const response = await fetch('/api/statistics');
-        const stats = await response.json();
+        // Statistics arrive with the article list; fetch them only if that hasn't happened
+        const stats = statistics || (await getJSON('/api/statistics')).data;
         
         const content = document.getElementById('statsContent');
         content.innerHTML = `
@@ -637,19 +901,34 @@ async function handleGoogleSheetsImport() {
         const result = await response.json();
 
         if (response.ok) {
-            articles = result.articles;
+            const job = await waitForImport(result.job_id);
+
+            if (job.status === 'already_imported') {
+                showStatus('This sheet is unchanged since it was last imported - nothing to do', 'success');
+                document.getElementById('importModal').style.display = 'none';
+                return;
+            }
+
+            if (job.status !== 'completed') {
+                await syncChanges();
+                showStatus(job.status === 'cancelled'
+                    ? `Import cancelled after ${job.inserted} new articles`
+                    : `Import failed: ${job.error || 'Unknown error'}`, 'error');
+                return;
+            }
+
+            await syncChanges();
 
             // Build status message
-            let statusMsg = `Import complete: ${result.total_count} total articles`;
-            if (result.new_count > 0) {
-                statusMsg += `, ${result.new_count} new`;
+            let statusMsg = `Import complete: ${articles.length} total articles`;
+            if (job.inserted > 0) {
+                statusMsg += `, ${job.inserted} new`;
             }
-            if (result.duplicate_count > 0) {
-                statusMsg += `, ${result.duplicate_count} duplicates removed`;
+            if (job.duplicate_count > 0) {
+                statusMsg += `, ${job.duplicate_count} duplicates removed`;
             }
 
             showStatus(statusMsg, 'success');
-            renderArticles();
 
             // Close modal and reset
             document.getElementById('importModal').style.display = 'none';
@@ -0,0 +1,127 @@
+"""
+Content-hashed URLs for static files.
+At startup every file in the static folder gets a fingerprinted name
+(app.js -> app.3f9c2a1b7d4e.js) that url_for('static', ...) emits in the
+templates. Fingerprinted URLs change whenever the content does, so they are
+served as immutable and browsers reuse them without revalidating.
+"""
+
+import hashlib
+import mimetypes
+import os
+
+from flask import send_from_directory
+from werkzeug.security import safe_join
+
+from compression import ENCODING_SUFFIXES, PRECOMPRESS_EXTENSIONS
+
+# One year, the longest max-age browsers honour
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def fingerprinted_name(filename, data):
+    """Insert a content hash before a filename's extension"""
+    base, ext = os.path.splitext(filename)
+    return f'{base}.{hashlib.sha256(data).hexdigest()[:12]}{ext}'
+
+
+class StaticAssets:
+    """Fingerprint and serve one Flask app's static files"""
+
+    def __init__(self, compressor=None, max_age=3600):
+        """
+        Initialize static file handling
+
+        Args:
+            compressor: Compressor whose precompressed copies are served to
+                        clients accepting them, or None
+            max_age: Cache-Control max-age, in seconds, for static files
+                     requested by their plain (unhashed) name
+        """
+        self.compressor = compressor
+        self.max_age = max_age
+        self.static_folder = None
+        self.manifest = {}
+        self._originals = {}
+
+    def init_app(self, app):
+        """Fingerprint the app's static files and route static URLs through this instance"""
+        self.static_folder = app.static_folder
+        self.build_manifest()
+        app.url_defaults(self.rewrite_url)
+        app.view_functions['static'] = self.static_view
+
+    def build_manifest(self):
+        """Hash every static file, mapping its name to the fingerprinted one"""
+        self.manifest = {}
+        if not self.static_folder or not os.path.isdir(self.static_folder):
+            return
+
+        for root, _dirs, files in os.walk(self.static_folder):
+            for name in files:
+                if name.endswith(tuple(ENCODING_SUFFIXES.values())) or name.endswith('.tmp'):
+                    continue  # Precompressed copies are found through their original
+                path = os.path.join(root, name)
+                filename = os.path.relpath(path, self.static_folder).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    self.manifest[filename] = fingerprinted_name(filename, f.read())
+
+        self._originals = {hashed: filename for filename, hashed in self.manifest.items()}
+
+    def rewrite_url(self, endpoint, values):
+        """url_defaults hook turning url_for('static', filename=...) into the fingerprinted URL"""
+        if endpoint == 'static' and values.get('filename') in self.manifest:
+            values['filename'] = self.manifest[values['filename']]
+
+    def static_view(self, filename):
+        """
+        Serve a static file by plain or fingerprinted name
+
+        Fingerprinted names get Cache-Control: immutable for a year. When
+        the client accepts an encoding whose precompressed copy exists, that
+        copy is sent instead of the original.
+        """
+        original = self._originals.get(filename)
+        if original is not None:
+            filename = original
+            max_age = IMMUTABLE_MAX_AGE
+        else:
+            max_age = self.max_age
+
+        response = None
+        if self.compressor is not None and filename.endswith(PRECOMPRESS_EXTENSIONS):
+            encoding = self.compressor.negotiate()
+            if encoding is not None:
+                variant = safe_join(self.static_folder, filename + ENCODING_SUFFIXES[encoding])
+                if variant and os.path.isfile(variant):
+                    response = send_from_directory(self.static_folder, filename + ENCODING_SUFFIXES[encoding],
+                                                   mimetype=mimetypes.guess_type(filename)[0], max_age=max_age)
+                    response.headers['Content-Encoding'] = encoding
+            response = response or send_from_directory(self.static_folder, filename, max_age=max_age)
+            response.vary.add('Accept-Encoding')
+        else:
+            response = send_from_directory(self.static_folder, filename, max_age=max_age)
+
+        if original is not None:
+            response.cache_control.immutable = True
+        return response
+
+
+def create_static_assets(app, compressor=None):
+    """
+    Factory function to install StaticAssets on a Flask app from environment settings
+
+    Fingerprinting is on unless STATIC_FINGERPRINTS is set to 0/false.
+    STATIC_MAX_AGE_SECONDS sets the cache lifetime of files requested by
+    their plain name.
+
+    Returns:
+        StaticAssets instance, or None when disabled
+    """
+    if os.environ.get('STATIC_FINGERPRINTS', '1').lower() in ('0', 'false', 'no'):
+        return None
+
+    assets = StaticAssets(compressor=compressor,
+                          max_age=int(os.environ.get('STATIC_MAX_AGE_SECONDS', 3600)))
+    assets.init_app(app)
+    return assets
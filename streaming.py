@@ -0,0 +1,218 @@
+"""
+Streaming response helpers for exports.
+Generators here produce a response body incrementally, so a large export is
+sent as it is rendered instead of being assembled in worker memory first.
+"""
+
+import io
+import json
+import zipfile
+import zlib
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable write target that collects bytes until they are drained"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(entries, compression=zipfile.ZIP_DEFLATED):
+    """
+    Stream a zip archive built from (filename, text) entries
+
+    zipfile writes data descriptors when its target can't seek, so every
+    entry can be flushed to the client as soon as it has been compressed.
+    Peak memory is one entry, not the whole archive.
+
+    Args:
+        entries: Iterable of (filename, str or bytes content) tuples
+        compression: zipfile compression method
+
+    Yields:
+        Chunks of the zip archive as bytes
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression) as zip_file:
+        for filename, content in entries:
+            zip_file.writestr(filename, content)
+            data = sink.drain()
+            if data:
+                yield data
+    # Central directory is written on close
+    data = sink.drain()
+    if data:
+        yield data
+
+
+def stream_json_document(header, list_key, items):
+    """
+    Stream a JSON object whose last member is a (potentially huge) list
+
+    Produces the same layout as json.dumps(..., indent=2) of
+    dict(header, **{list_key: list(items)}), without materializing the list.
+
+    Args:
+        header: Dict of the object's leading members
+        list_key: Name of the list member written last
+        items: Iterable of JSON-serializable list elements
+
+    Yields:
+        UTF-8 encoded chunks
+    """
+    yield '{\n'.encode('utf-8')
+    for key, value in header.items():
+        member = json.dumps({key: value}, indent=2, ensure_ascii=False)[2:-2]
+        yield f'{member},\n'.encode('utf-8')
+
+    yield f'  {json.dumps(list_key)}: ['.encode('utf-8')
+    separator = '\n'
+    for item in items:
+        # Indent on '\n' only: strings may hold U+2028 and other characters
+        # that str.splitlines() (and so textwrap.indent) treat as line breaks
+        encoded = json.dumps(item, indent=2, ensure_ascii=False).replace('\n', '\n    ')
+        yield f'{separator}    {encoded}'.encode('utf-8')
+        separator = ',\n'
+    yield ('\n  ]\n}' if separator == ',\n' else ']\n}').encode('utf-8')
+
+
+def stream_ndjson(items):
+    """
+    Stream items as newline-delimited JSON, one compact object per line
+
+    Yields:
+        UTF-8 encoded lines
+    """
+    for item in items:
+        yield (json.dumps(item, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+class _JsonObjectReader:
+    """Read a top-level JSON object's members from a text file a chunk at a time"""
+
+    def __init__(self, f, chunk_size):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        chunk = self._f.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        # Drop what has been consumed so the buffer stays about one member long
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _skip_whitespace(self):
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in ' \t\r\n':
+                self._pos += 1
+            if self._pos < len(self._buf) or not self._fill():
+                return
+
+    def expect(self, chars):
+        self._skip_whitespace()
+        if self._pos >= len(self._buf) or self._buf[self._pos] not in chars:
+            raise ValueError(f'Expected one of {chars!r} at offset {self._pos} of the buffered JSON')
+        char = self._buf[self._pos]
+        self._pos += 1
+        return char
+
+    def peek(self):
+        self._skip_whitespace()
+        return self._buf[self._pos] if self._pos < len(self._buf) else ''
+
+    def value(self):
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+                # A number cut off by the chunk boundary (e.g. "3.5" of "3.5e10")
+                # decodes fine, so only trust a value once a delimiter follows it
+                if self._eof or (end < len(self._buf) and self._buf[end] in ' \t\r\n,:]}'):
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+
+
+def iter_json_object_items(path, chunk_size=64 * 1024):
+    """
+    Iterate over the members of a JSON object file without loading it whole
+
+    Peak memory is one member plus one chunk, so an export can walk a large
+    file written by json.dump without decoding the entire document.
+
+    Args:
+        path: Path to a UTF-8 file holding a single JSON object
+        chunk_size: Characters read from the file at a time
+
+    Yields:
+        (key, value) tuples in file order
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = _JsonObjectReader(f, chunk_size)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+        while True:
+            key = reader.value()
+            if not isinstance(key, str):
+                raise ValueError('JSON object keys must be strings')
+            reader.expect(':')
+            yield key, reader.value()
+            if reader.expect(',}') == '}':
+                return
+
+
+def stream_file(path, chunk_size=64 * 1024):
+    """
+    Stream a file from disk in fixed-size chunks
+
+    Yields:
+        Chunks of the file as bytes
+    """
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def stream_gzip(chunks, level=6):
+    """
+    Gzip-compress a stream of byte chunks on the fly
+
+    Args:
+        chunks: Iterable of bytes
+        level: zlib compression level (1-9)
+
+    Yields:
+        Chunks of a single gzip member
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
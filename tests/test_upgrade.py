@@ -0,0 +1,80 @@
+"""
+Upgrading a database created by the original schema (articles keyed by a
+unique url, no url_hash, no article_stats) through DatabaseManager.setup_schema.
+"""
+
+import sqlite3
+
+import pytest
+
+import database
+
+BASELINE_SCHEMA = """
+CREATE TABLE articles (
+    id INTEGER PRIMARY KEY,
+    url VARCHAR(2048) NOT NULL,
+    title VARCHAR(512) NOT NULL,
+    created_at DATETIME
+);
+CREATE UNIQUE INDEX ix_articles_url ON articles (url);
+CREATE TABLE scores (
+    id INTEGER PRIMARY KEY,
+    article_id INTEGER NOT NULL REFERENCES articles (id),
+    accuracy INTEGER NOT NULL,
+    credibility INTEGER NOT NULL,
+    citation INTEGER NOT NULL,
+    reasoning INTEGER NOT NULL,
+    confidence INTEGER NOT NULL,
+    notes TEXT,
+    timestamp DATETIME
+);
+"""
+
+
+@pytest.fixture
+def baseline_db(tmp_path):
+    """Baseline database with host-case duplicate URLs and other scored articles"""
+    path = tmp_path / 'baseline.db'
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    conn.executemany('INSERT INTO articles VALUES (?, ?, ?, ?)', [
+        (1, 'https://A.com/x', 'Upper', '2026-01-01 00:00:00'),
+        (2, 'https://a.com/x', 'Lower', '2026-01-02 00:00:00'),
+        (3, 'https://z.com/b', 'Other', '2026-01-03 00:00:00'),
+        (4, 'https://u.com/c', 'Unscored', '2026-01-04 00:00:00'),
+    ])
+    conn.executemany('INSERT INTO scores VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', [
+        (1, 1, 4, 4, 4, 4, 4, '', '2026-01-01 00:00:00'),
+        (2, 2, 6, 6, 6, 6, 6, '', '2026-01-02 00:00:00'),
+        (3, 3, 5, 5, 5, 5, 5, '', '2026-01-03 00:00:00'),
+    ])
+    conn.commit()
+    conn.close()
+    return f'sqlite:///{path}'
+
+
+def test_upgrade_merges_duplicates_and_backfills_stats(baseline_db):
+    db = database.DatabaseManager(baseline_db, create_schema=True)
+
+    merged = db.get_article_stats('https://a.com/x')
+    assert merged['count'] == 2
+    assert merged['overall_average'] == 5.0
+    assert db.get_article_stats('https://A.COM/x') == merged
+
+    other = db.get_article_stats('https://z.com/b')
+    assert other is not None
+    assert other['count'] == 1
+    assert db.get_article_stats('https://u.com/c') is None
+
+    urls = {article['url'] for article in db.get_scored_articles('4-6')}
+    assert urls == {'https://A.com/x', 'https://z.com/b'}
+
+
+def test_upgrade_is_idempotent(baseline_db):
+    database.DatabaseManager(baseline_db, create_schema=True)
+    db = database.DatabaseManager(baseline_db, create_schema=True)
+
+    articles, _ = db.get_articles_page(include_stats=True)
+    counts = {article['URL']: article['count'] for article in articles}
+    assert counts == {'https://A.com/x': 2, 'https://z.com/b': 1, 'https://u.com/c': 0}
+    assert db.get_statistics()['total_scores'] == 3
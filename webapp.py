@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, jsonify, send_file, session
+from flask import Flask, Response, render_template, request, jsonify, send_file, session
 from werkzeug.utils import secure_filename
 import pandas as pd
 import json
@@ -7,6 +7,7 @@ import secrets
 from datetime import datetime
 from pathlib import Path
 import io
+from streaming import iter_json_object_items, stream_file, stream_ndjson, stream_gzip
 
 app = Flask(__name__)
 app.secret_key = secrets.token_hex(32)
@@ -369,19 +370,48 @@ def export_json():
 
 @app.route('/api/export/all', methods=['GET'])
 def export_all_json():
-    """Export complete database as JSON"""
+    """
+    Export complete database as JSON, streamed
+    
+    Query params:
+        format: 'json' (default) or 'ndjson' (one {"url", "scores"} object per line)
+        gzip: Set to 1 to compress the download on the fly
+    """
     try:
-        scores_data = load_scores()
+        export_format = request.args.get('format', 'json')
+        compress = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
         
-        json_buffer = io.BytesIO()
-        json_buffer.write(json.dumps(scores_data, indent=2, ensure_ascii=False).encode('utf-8'))
-        json_buffer.seek(0)
+        if export_format not in ('json', 'ndjson'):
+            return jsonify({'error': 'Unsupported format. Use json or ndjson'}), 400
         
-        return send_file(
-            json_buffer,
-            mimetype='application/json',
-            as_attachment=True,
-            download_name=f'all_scores_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
+        if export_format == 'ndjson':
+            # Walk the scores file member by member instead of load_scores(),
+            # so the export never holds the whole file in memory
+            if os.path.exists(app.config['SCORES_FILE']):
+                scores_items = iter_json_object_items(app.config['SCORES_FILE'])
+            else:
+                scores_items = iter(())
+            body = stream_ndjson({'url': url, 'scores': scores} for url, scores in scores_items)
+            mimetype = 'application/x-ndjson'
+        elif os.path.exists(app.config['SCORES_FILE']):
+            # save_scores already wrote exactly this JSON, so stream the file
+            # from disk rather than decoding and re-encoding it
+            body = stream_file(app.config['SCORES_FILE'])
+            mimetype = 'application/json'
+        else:
+            body = iter([b'{}'])
+            mimetype = 'application/json'
+        
+        download_name = f'all_scores_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{export_format}'
+        if compress:
+            body = stream_gzip(body)
+            mimetype = 'application/gzip'
+            download_name += '.gz'
+        
+        return Response(
+            body,
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename={download_name}'}
         )
     
     except Exception as e:
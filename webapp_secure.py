@@ -1,7 +1,6 @@
-from flask import Flask, render_template, request, jsonify, send_file, session, redirect, url_for
+from flask import Flask, Response, make_response, render_template, request, jsonify, send_file, session, redirect, url_for
 from werkzeug.utils import secure_filename
 from werkzeug.security import check_password_hash, generate_password_hash
-import pandas as pd
 import json
 import os
 import secrets
@@ -9,15 +8,25 @@ from datetime import datetime
 from pathlib import Path
 from functools import wraps
 import io
-import re
+import itertools
 from database import get_db, init_db
 from google_sheets import get_sheets_importer
+from article_parsing import iter_upload_articles, smart_parse_dataframe, UPLOAD_EXTENSIONS
+from score_buffer import create_score_buffer
+from query_metrics import create_query_metrics
+from read_cache import create_read_cache
+from single_flight import create_single_flight
+from import_jobs import create_import_runner, content_hash, spool_upload, ImportQueueFull
+from streaming import stream_zip, stream_json_document, stream_ndjson, stream_gzip
+from compression import create_compressor
+from change_feed import create_change_feed
+from prometheus_metrics import create_prometheus_metrics
+from static_assets import create_static_assets
 
 app = Flask(__name__)
 # Use a consistent secret key for development, or from environment for production
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production-12345678901234567890')
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
-app.config['UPLOAD_FOLDER'] = 'uploads'
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_MB', 16)) * 1024 * 1024
 app.config['SCORES_FILE'] = 'article_scores.json'
 app.config['ARTICLES_FILE'] = 'article_list.json'
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
@@ -38,12 +47,37 @@ def get_password_hash():
         return generate_password_hash(admin_password)
     return DEFAULT_PASSWORD_HASH
 
-# Ensure directories exist
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-
 # Initialize database
 db = init_db()
 
+# Optional per-method SQL timing and slow-query log (DB_QUERY_METRICS=1)
+query_metrics = create_query_metrics(db)
+
+# Optional version-checked cache for full score map and statistics (DB_READ_CACHE=1)
+read_cache = create_read_cache(db)
+
+# Optional coalescing of concurrent identical score map/statistics reads (DB_COALESCE_READS=1)
+single_flight = create_single_flight(db)
+
+# Optional server-sent live updates fed from the change_events table (LIVE_UPDATES=1)
+change_feed = create_change_feed(db)
+
+# Background import jobs, bounded per worker (IMPORT_MAX_CONCURRENT / IMPORT_MAX_PENDING)
+import_runner = create_import_runner(db)
+
+# Optional write-behind group commit for score submissions (SCORE_WRITE_BEHIND=1)
+score_buffer = create_score_buffer(db)
+
+# Optional Prometheus metrics at /metrics, aggregated across workers (PROMETHEUS_METRICS=1).
+# Installed before compression so its after_request hook runs last and sees the bytes sent
+prometheus_metrics = create_prometheus_metrics(app, db, import_runner)
+
+# gzip/brotli for large JSON and text responses, precompressed static files (COMPRESS_RESPONSES=0 disables)
+compressor = create_compressor(app)
+
+# Content-hashed static URLs served as immutable (STATIC_FINGERPRINTS=0 disables)
+static_assets = create_static_assets(app, compressor)
+
 def login_required(f):
     """Decorator to require authentication"""
     @wraps(f)
@@ -53,6 +87,31 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def conditional_get(f):
+    """
+    Decorator to tag read responses with a strong ETag from the data version
+    
+    The version is read before the view runs, so a concurrent write can only
+    make the tagged body newer than its tag, never staler. A request whose
+    If-None-Match already holds the current tag gets 304 without the view
+    (and its article/score queries) running at all. The match is weak, as
+    If-None-Match requires, so the W/ tag of a compressed body matches too.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        etag = f'v{db.get_data_version()}'
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        # Let browsers store the body but revalidate it on every use
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return decorated_function
+
 def load_scores():
     """Load existing scores from JSON file"""
     if os.path.exists(app.config['SCORES_FILE']):
@@ -105,132 +164,6 @@ def merge_articles(existing_articles, new_articles):
     
     return merged_list, new_count, duplicates
 
-def is_url(text):
-    """Smart URL detection using regex"""
-    if not isinstance(text, str):
-        return False
-    
-    # URL pattern - matches http://, https://, www., and common domains
-    url_pattern = r'https?://[^\s]+|www\.[^\s]+|[a-zA-Z0-9-]+\.(com|org|net|edu|gov|io|co|ai|app|dev)[^\s]*'
-    return bool(re.search(url_pattern, text.strip()))
-
-def extract_url_and_title(row_data):
-    """Extract URL and title from a row of data (list or dict)"""
-    url = None
-    title = None
-    
-    if isinstance(row_data, dict):
-        # Dictionary - check all values for URLs
-        values = list(row_data.values())
-    else:
-        # List or tuple
-        values = list(row_data)
-    
-    # Find first URL
-    for val in values:
-        if is_url(val):
-            url = str(val).strip()
-            # Ensure URL has protocol
-            if not url.startswith('http'):
-                url = 'https://' + url
-            break
-    
-    # Find title (first non-URL text value, or use URL)
-    for val in values:
-        if val and not is_url(val) and isinstance(val, str) and len(val.strip()) > 0:
-            title = str(val).strip()
-            break
-    
-    if not title and url:
-        title = url[:50] + '...' if len(url) > 50 else url
-    
-    return url, title
-
-def parse_txt_file(filepath):
-    """Parse a .txt file - automatically detects URLs"""
-    articles = []
-    with open(filepath, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-            
-            # Try comma-separated format first
-            if ',' in line:
-                parts = [p.strip() for p in line.split(',')]
-                url, title = extract_url_and_title(parts)
-            else:
-                # Single value - check if it's a URL
-                url, title = extract_url_and_title([line])
-            
-            if url:
-                articles.append({'URL': url, 'Title': title})
-    
-    return pd.DataFrame(articles) if articles else pd.DataFrame(columns=['URL', 'Title'])
-
-def smart_parse_dataframe(df):
-    """Smart parsing of dataframe - automatically detects URL and Title columns"""
-    articles = []
-    
-    # Try to find columns by common names first
-    url_col = None
-    title_col = None
-    
-    # Check for common URL column names (case-insensitive)
-    url_names = ['url', 'link', 'source', 'article', 'webpage', 'site']
-    for col in df.columns:
-        if str(col).lower().strip() in url_names:
-            url_col = col
-            break
-    
-    # Check for common title column names
-    title_names = ['title', 'headline', 'name', 'article title', 'description']
-    for col in df.columns:
-        if str(col).lower().strip() in title_names:
-            title_col = col
-            break
-    
-    # If no obvious columns found, scan data to find URLs
-    if not url_col:
-        for col in df.columns:
-            # Check first few non-null values
-            sample_values = df[col].dropna().head(5)
-            if any(is_url(str(val)) for val in sample_values):
-                url_col = col
-                break
-    
-    if not url_col:
-        return []  # No URLs found
-    
-    # Process each row
-    for idx, row in df.iterrows():
-        url = str(row[url_col]).strip() if pd.notna(row[url_col]) else None
-        
-        if url and is_url(url):
-            # Ensure URL has protocol
-            if not url.startswith('http'):
-                url = 'https://' + url
-            
-            # Get title
-            if title_col and pd.notna(row[title_col]):
-                title = str(row[title_col]).strip()
-            else:
-                # Look for first non-URL text column
-                title = None
-                for col in df.columns:
-                    if col != url_col and pd.notna(row[col]):
-                        val = str(row[col]).strip()
-                        if not is_url(val) and len(val) > 0:
-                            title = val
-                            break
-                
-                if not title:
-                    title = url[:50] + '...' if len(url) > 50 else url
-            
-            articles.append({'URL': url, 'Title': title})
-    
-    return articles
-
 @app.route('/login')
 def login_page():
     """Login page"""
@@ -264,18 +197,139 @@ def index():
 
 @app.route('/api/articles', methods=['GET'])
 @login_required
+@conditional_get
 def get_articles():
-    """Get all persisted articles"""
-    articles = db.get_all_articles()
-    return jsonify({
+    """
+    Get a page of persisted articles, newest first
+    
+    Query params:
+        cursor: next_cursor from the previous page (omit for the first page)
+        limit: page size, capped server-side
+    """
+    cursor = request.args.get('cursor')
+    try:
+        articles, next_cursor = db.get_articles_page(cursor, request.args.get('limit', type=int))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    result = {
         'articles': articles,
-        'count': len(articles)
-    })
+        'count': len(articles),
+        'next_cursor': next_cursor
+    }
+    if not cursor:
+        # Only the first page pays for the total
+        result['total_count'] = db.count_articles()
+    return jsonify(result)
+
+@app.route('/api/bootstrap', methods=['GET'])
+@login_required
+@conditional_get
+def get_bootstrap():
+    """
+    Get everything the article list needs in one call
+    
+    Returns a page of articles like /api/articles, each with its score
+    'count' and 'average' precomputed from article_stats, so the list
+    doesn't need the raw scores; those stay behind /api/scores/<url>.
+    The first page also carries total_count, the global statistics and a
+    changes_cursor for /api/changes.
+    
+    Query params:
+        cursor: next_cursor from the previous page (omit for the first page)
+        limit: page size, capped server-side
+    """
+    cursor = request.args.get('cursor')
+    if not cursor:
+        # Taken before the snapshot, so nothing written during it is missed
+        changes_cursor = db.get_changes_cursor()
+    try:
+        articles, next_cursor = db.get_articles_page(cursor, request.args.get('limit', type=int),
+                                                     include_stats=True)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    result = {
+        'articles': articles,
+        'count': len(articles),
+        'next_cursor': next_cursor
+    }
+    if not cursor:
+        result['total_count'] = db.count_articles()
+        result['statistics'] = db.get_statistics()
+        result['live_updates'] = change_feed is not None
+        result['changes_cursor'] = changes_cursor
+    return jsonify(result)
+
+@app.route('/api/changes', methods=['GET'])
+@login_required
+@conditional_get
+def get_changes():
+    """
+    Get articles and scores created since a cursor
+    
+    Lets a client that already holds the data refresh in O(changes)
+    instead of reloading everything. Rows written while the client's
+    snapshot loaded are returned again; deduplicate articles by URL and
+    scores by id.
+    
+    Query params:
+        since: changes_cursor from /api/bootstrap or next_cursor from a
+               previous call
+        limit: most articles and most scores per call, capped server-side;
+               call again while has_more is true
+    """
+    since = request.args.get('since')
+    if not since:
+        return jsonify({'error': 'since is required'}), 400
+    
+    try:
+        changes = db.get_changes(since, request.args.get('limit', type=int))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if changes['articles'] or changes['scores']:
+        changes['statistics'] = db.get_statistics()
+    return jsonify(changes)
+
+@app.route('/api/events', methods=['GET'])
+@login_required
+def stream_events():
+    """
+    Server-sent events stream of live changes
+    
+    Pushes 'score_added' (url, title, count, average) and
+    'articles_imported' (count, plus the articles for small imports)
+    events as other requests commit them, and 'resync' when the client
+    should reload. Reconnecting clients resume from Last-Event-ID.
+    """
+    if not change_feed:
+        # 204 tells EventSource not to reconnect
+        return Response(status=204)
+    
+    resume_from = request.headers.get('Last-Event-ID', type=int)
+    subscribed = change_feed.subscribe()
+    if subscribed is None:
+        return jsonify({'error': 'Too many live update connections, try again shortly'}), 503
+    subscription, last_seen_id = subscribed
+    
+    response = Response(change_feed.stream(subscription, last_seen_id, resume_from),
+                        mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Don't let proxies buffer the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 @app.route('/api/import', methods=['POST'])
 @login_required
 def import_file():
-    """Import articles from uploaded file - automatically detects URLs"""
+    """
+    Start a background import of an uploaded file - automatically detects URLs
+    
+    Returns 202 with the job ID; poll /api/import/jobs/<job_id> for progress.
+    A file identical to one already imported returns 200 with
+    already_imported and the earlier outcome instead.
+    """
     if 'file' not in request.files:
         return jsonify({'error': 'No file provided'}), 400
     
@@ -283,47 +337,65 @@ def import_file():
     if file.filename == '':
         return jsonify({'error': 'No file selected'}), 400
     
+    filename = secure_filename(file.filename)
+    if not filename.endswith(UPLOAD_EXTENSIONS):
+        return jsonify({'error': 'Unsupported file format. Use .csv, .xlsx, .xls, or .txt'}), 400
+    
+    # The job parses a temporary copy in chunks and removes it when done,
+    # so no worker holds the whole upload in memory while the import runs
+    path, upload_hash = spool_upload(file.stream, suffix=os.path.splitext(filename)[1])
+    
+    # Re-uploads of a file that was already imported are a no-op
     try:
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        
-        # Parse file based on type
-        if filename.endswith('.txt'):
-            df = parse_txt_file(filepath)
-            new_articles = df.to_dict('records') if not df.empty else []
-        elif filename.endswith('.csv'):
-            df = pd.read_csv(filepath)
-            new_articles = smart_parse_dataframe(df)
-        elif filename.endswith(('.xlsx', '.xls')):
-            df = pd.read_excel(filepath)
-            new_articles = smart_parse_dataframe(df)
-        else:
-            os.remove(filepath)
-            return jsonify({'error': 'Unsupported file format. Use .csv, .xlsx, .xls, or .txt'}), 400
-        
-        if not new_articles:
-            os.remove(filepath)
-            return jsonify({'error': 'No URLs detected in file. Please ensure file contains valid URLs.'}), 400
-        
-        # Add articles to database (handles deduplication)
-        merged_articles, new_count, duplicates = db.add_articles(new_articles)
-        
-        os.remove(filepath)
-        
+        previous = import_runner.find_previous_import(upload_hash)
+    except Exception:
+        os.remove(path)
+        raise
+    if previous is not None:
+        os.remove(path)
         return jsonify({
             'success': True,
-            'articles': merged_articles,
-            'total_count': len(merged_articles),
-            'new_count': new_count,
-            'duplicate_count': len(duplicates),
-            'duplicates': duplicates[:10]  # Show first 10 duplicates
+            'already_imported': True,
+            'previous_import': previous
         })
     
+    try:
+        job_id = import_runner.submit(filename, lambda content_seen: iter_upload_articles(filename, path),
+                                      cleanup=lambda: os.remove(path), content_hash=upload_hash)
+    except ImportQueueFull as e:
+        return jsonify({'error': str(e)}), 429
     except Exception as e:
-        if os.path.exists(filepath):
-            os.remove(filepath)
         return jsonify({'error': f'Failed to import file: {str(e)}'}), 500
+    
+    return import_job_accepted(job_id)
+
+def import_job_accepted(job_id):
+    """202 response pointing at a queued import job"""
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status_url': url_for('get_import_job', job_id=job_id)
+    }), 202
+
+@app.route('/api/import/jobs/<job_id>', methods=['GET'])
+@login_required
+def get_import_job(job_id):
+    """Get an import job's status and progress (rows parsed, inserted, duplicates)"""
+    job = db.get_import_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Import job not found'}), 404
+    return jsonify(job)
+
+@app.route('/api/import/jobs/<job_id>/cancel', methods=['POST'])
+@login_required
+def cancel_import_job(job_id):
+    """Ask an import job to stop before its next chunk; committed chunks are kept"""
+    if db.request_import_cancel(job_id):
+        return jsonify({'success': True, 'job': db.get_import_job(job_id)})
+    job = db.get_import_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Import job not found'}), 404
+    return jsonify({'error': f"Import job already {job['status']}", 'job': job}), 409
 
 """
 Add this endpoint to webapp_secure.py after the /api/import endpoint
@@ -333,82 +405,99 @@ Insert around line 328 (after the file import endpoint)
 @app.route('/api/import/google-sheet', methods=['POST'])
 @login_required
 def import_google_sheet():
-    """Import articles from a Google Sheets URL"""
-    try:
-        data = request.json
-        sheet_url = data.get('url', '').strip()
-        sheet_name = data.get('sheetName', None)  # Optional worksheet name
-        
-        if not sheet_url:
-            return jsonify({'error': 'No Google Sheets URL provided'}), 400
-        
-        # Validate it looks like a Google Sheets URL
-        if 'docs.google.com/spreadsheets' not in sheet_url and '/d/' not in sheet_url:
-            return jsonify({'error': 'Invalid Google Sheets URL. Please provide a valid sheets.google.com link'}), 400
-        
-        # Get Google Sheets importer
-        sheets_importer = get_sheets_importer()
-        
-        # Import the sheet
-        df = sheets_importer.import_sheet(sheet_url, sheet_name)
+    """
+    Start a background import of a Google Sheets URL
+    
+    Returns 202 with the job ID; poll /api/import/jobs/<job_id> for progress.
+    The job ends as 'already_imported' if the sheet's content is unchanged
+    since an earlier import.
+    """
+    data = request.get_json(silent=True) or {}
+    sheet_url = data.get('url', '').strip()
+    sheet_name = data.get('sheetName', None)  # Optional worksheet name
+    
+    if not sheet_url:
+        return jsonify({'error': 'No Google Sheets URL provided'}), 400
+    
+    # Validate it looks like a Google Sheets URL
+    if 'docs.google.com/spreadsheets' not in sheet_url and '/d/' not in sheet_url:
+        return jsonify({'error': 'Invalid Google Sheets URL. Please provide a valid sheets.google.com link'}), 400
+    
+    def parse(content_seen):
+        # Errors from the Google Sheets importer arrive as ValueError and
+        # become the job's error message
+        df = get_sheets_importer().import_sheet(sheet_url, sheet_name)
         
         if df.empty:
-            return jsonify({'error': 'Google Sheet is empty or could not be read'}), 400
+            raise ValueError('Google Sheet is empty or could not be read')
         
-        # Use smart parsing to detect URLs
-        from webapp_secure import smart_parse_dataframe  # Import the function
-        new_articles = smart_parse_dataframe(df)
-        
-        if not new_articles:
-            return jsonify({'error': 'No URLs detected in Google Sheet. Make sure the sheet contains article URLs.'}), 400
-        
-        # Add articles to database (handles deduplication)
-        merged_articles, new_count, duplicates = db.add_articles(new_articles)
+        # An unchanged sheet exports to the same CSV bytes
+        content_seen(content_hash(df.to_csv(index=False).encode('utf-8')))
         
-        return jsonify({
-            'success': True,
-            'articles': merged_articles,
-            'total_count': len(merged_articles),
-            'new_count': new_count,
-            'duplicate_count': len(duplicates),
-            'duplicates': duplicates[:10]  # Show first 10 duplicates
-        })
+        # Use smart parsing to detect URLs
+        return [(len(df), smart_parse_dataframe(df))]
     
-    except ValueError as e:
-        # Specific error from Google Sheets importer
-        return jsonify({'error': str(e)}), 400
+    try:
+        job_id = import_runner.submit(sheet_url, parse)
+    except ImportQueueFull as e:
+        return jsonify({'error': str(e)}), 429
     except Exception as e:
         return jsonify({'error': f'Failed to import Google Sheet: {str(e)}'}), 500
+    
+    return import_job_accepted(job_id)
 
 
 @app.route('/api/scores', methods=['GET'])
 @login_required
+@conditional_get
 def get_scores():
-    """Get all scores"""
-    scores_data = db.get_all_scores()
-    return jsonify(scores_data)
+    """
+    Get scores keyed by article URL
+    
+    Always returns one page as {'scores': {...}, 'next_cursor': ...};
+    limit defaults to the default page size and is capped. Follow
+    next_cursor until it is null to walk the whole table.
+    """
+    try:
+        scores_data, next_cursor = db.get_scores_page(
+            request.args.get('cursor'), request.args.get('limit', type=int)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'scores': scores_data,
+        'next_cursor': next_cursor
+    })
 
 @app.route('/api/scores/<path:url>', methods=['GET'])
 @login_required
+@conditional_get
 def get_article_scores(url):
     """Get scores for a specific article"""
     article_scores = db.get_scores_for_article(url)
     
     if article_scores:
-        categories = ['accuracy', 'credibility', 'citation', 'reasoning', 'confidence']
-        
-        cat_avgs = {}
-        for cat in categories:
-            cat_scores = [s.get(cat, 0) for s in article_scores]
-            cat_avgs[cat] = sum(cat_scores) / len(cat_scores) if cat_scores else 0
-        
-        overall = sum(cat_avgs.values()) / len(categories)
+        # Averages come from the maintained article_stats row instead of
+        # being recomputed from the raw scores
+        stats = db.get_article_stats(url)
+        
+        if stats is None:
+            # Scores predate article_stats and haven't been backfilled yet
+            categories = ['accuracy', 'credibility', 'citation', 'reasoning', 'confidence']
+            cat_avgs = {cat: sum(s.get(cat, 0) for s in article_scores) / len(article_scores) for cat in categories}
+            stats = {
+                'category_averages': cat_avgs,
+                'category_variances': {},
+                'overall_average': sum(cat_avgs.values()) / len(categories)
+            }
         
         return jsonify({
             'scores': article_scores,
             'count': len(article_scores),
-            'category_averages': cat_avgs,
-            'overall_average': overall
+            'category_averages': stats['category_averages'],
+            'category_variances': stats['category_variances'],
+            'overall_average': stats['overall_average']
         })
     
     return jsonify({
@@ -418,6 +507,30 @@ def get_article_scores(url):
         'overall_average': 0
     })
 
+def validate_score_data(score_data):
+    """
+    Validate a submitted score
+    
+    Returns:
+        Error message string, or None if the score is valid
+    """
+    if not isinstance(score_data, dict):
+        return 'Score must be a JSON object'
+    
+    required_fields = ['accuracy', 'credibility', 'citation', 'reasoning', 'confidence']
+    for field in required_fields:
+        if field not in score_data:
+            return f'Missing required field: {field}'
+        
+        score_value = score_data[field]
+        if not isinstance(score_value, (int, float)) or score_value < 1 or score_value > 10:
+            return f'Invalid score for {field}: must be between 1 and 10'
+    
+    if not isinstance(score_data.get('notes', ''), str):
+        return 'Notes must be text'
+    
+    return None
+
 @app.route('/api/scores/<path:url>', methods=['POST'])
 @login_required
 def add_score(url):
@@ -425,19 +538,17 @@ def add_score(url):
     try:
         score_data = request.json
         
-        required_fields = ['accuracy', 'credibility', 'citation', 'reasoning', 'confidence']
-        for field in required_fields:
-            if field not in score_data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
-            
-            score_value = score_data[field]
-            if not isinstance(score_value, (int, float)) or score_value < 1 or score_value > 10:
-                return jsonify({'error': f'Invalid score for {field}: must be between 1 and 10'}), 400
+        error = validate_score_data(score_data)
+        if error:
+            return jsonify({'error': error}), 400
         
         score_data['timestamp'] = datetime.now().isoformat()
         
-        # Save score to database
-        db.add_score(url, score_data)
+        # Save score to database, through the group-commit buffer if enabled
+        if score_buffer:
+            score_buffer.add_score(url, score_data)
+        else:
+            db.add_score(url, score_data)
         
         return jsonify({
             'success': True,
@@ -447,107 +558,211 @@ def add_score(url):
     except Exception as e:
         return jsonify({'error': f'Failed to add score: {str(e)}'}), 500
 
+# Maximum number of scores accepted by one batch request
+MAX_SCORE_BATCH = 500
+
+@app.route('/api/scores/batch', methods=['POST'])
+@login_required
+def add_scores_batch():
+    """
+    Add many scores in one request and one database transaction
+    
+    Body: {"scores": [{"url": ..., "accuracy": ..., ...}, ...]}
+    Invalid or failing items are reported per item; the rest are saved.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Body must be a JSON object with a "scores" list'}), 400
+        items = data.get('scores')
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'Provide a non-empty "scores" list'}), 400
+        if len(items) > MAX_SCORE_BATCH:
+            return jsonify({'error': f'Too many scores in one batch (max {MAX_SCORE_BATCH})'}), 400
+        
+        results = [None] * len(items)
+        valid = []
+        for i, item in enumerate(items):
+            url = item.get('url', '').strip() if isinstance(item, dict) and isinstance(item.get('url'), str) else ''
+            error = 'Missing article url' if not url else validate_score_data(item)
+            if error:
+                results[i] = {'url': url, 'success': False, 'error': error}
+            else:
+                valid.append((i, url, item))
+        
+        if valid:
+            db_results = db.add_scores_bulk([(url, item) for _, url, item in valid])
+            for (i, _, _), result in zip(valid, db_results):
+                results[i] = result
+        
+        added = sum(1 for r in results if r['success'])
+        
+        return jsonify({
+            'success': True,
+            'added': added,
+            'failed': len(results) - added,
+            'results': results
+        })
+    
+    except Exception as e:
+        return jsonify({'error': f'Failed to add scores: {str(e)}'}), 500
+
+@app.route('/api/metrics/score-buffer', methods=['GET'])
+@login_required
+def get_score_buffer_metrics():
+    """Get write-behind group size and commit latency metrics for this worker"""
+    if not score_buffer:
+        return jsonify({'enabled': False})
+    return jsonify(dict(score_buffer.get_metrics(), enabled=True))
+
+@app.route('/api/metrics/queries', methods=['GET'])
+@login_required
+def get_query_metrics():
+    """Get per-DatabaseManager-method SQL statement metrics for this worker"""
+    if not query_metrics:
+        return jsonify({'enabled': False})
+    return jsonify(dict(query_metrics.get_metrics(), enabled=True))
+
+@app.route('/api/metrics/read-cache', methods=['GET'])
+@login_required
+def get_read_cache_metrics():
+    """Get read cache hit/miss counters for this worker"""
+    if not read_cache:
+        return jsonify({'enabled': False})
+    return jsonify(dict(read_cache.get_metrics(), enabled=True))
+
+@app.route('/api/metrics/single-flight', methods=['GET'])
+@login_required
+def get_single_flight_metrics():
+    """Get read coalescing counters for this worker"""
+    if not single_flight:
+        return jsonify({'enabled': False})
+    return jsonify(dict(single_flight.get_metrics(), enabled=True))
+
+@app.route('/api/metrics/compression', methods=['GET'])
+@login_required
+def get_compression_metrics():
+    """Get response compression counters for this worker"""
+    if not compressor:
+        return jsonify({'enabled': False})
+    return jsonify(dict(compressor.get_metrics(), enabled=True))
+
+@app.route('/api/metrics/live-updates', methods=['GET'])
+@login_required
+def get_live_update_metrics():
+    """Get live update feed counters for this worker"""
+    if not change_feed:
+        return jsonify({'enabled': False})
+    return jsonify(dict(change_feed.get_metrics(), enabled=True))
+
+@app.route('/metrics', methods=['GET'])
+def get_prometheus_metrics():
+    """
+    Prometheus scrape endpoint
+    
+    With METRICS_TOKEN set, scrapers authenticate with
+    'Authorization: Bearer <token>'; otherwise a logged-in session is required.
+    """
+    if not prometheus_metrics:
+        return jsonify({'enabled': False}), 404
+    
+    token = os.environ.get('METRICS_TOKEN')
+    if token:
+        if not secrets.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return jsonify({'error': 'Authentication required'}), 401
+    elif not session.get('authenticated'):
+        return jsonify({'error': 'Authentication required', 'redirect': '/login'}), 401
+    
+    body, content_type = prometheus_metrics.render()
+    return Response(body, content_type=content_type)
+
 @app.route('/api/statistics', methods=['GET'])
 @login_required
+@conditional_get
 def get_statistics():
     """Get overall statistics for all articles"""
     stats = db.get_statistics()
     return jsonify(stats)
 
+def render_article_report(article, include_details=True, include_notes=True):
+    """Render one article's plain-text scoring report"""
+    categories = ['accuracy', 'credibility', 'citation', 'reasoning', 'confidence']
+    url = article['url']
+    avg = article['overall_average']
+    
+    content = []
+    content.append("=" * 80)
+    content.append("ARTICLE SCORING REPORT")
+    content.append("=" * 80)
+    content.append("")
+    content.append(f"URL: {url}")
+    content.append("")
+    content.append(f"OVERALL AVERAGE SCORE: {avg:.2f} / 10")
+    content.append(f"NUMBER OF PEER SCORES: {article['count']}")
+    content.append("")
+    
+    content.append("-" * 80)
+    content.append("CATEGORY AVERAGES")
+    content.append("-" * 80)
+    content.append("")
+    
+    for cat in categories:
+        cat_avg = article['category_averages'][cat]
+        content.append(f"{cat.title():30s}: {cat_avg:.2f} / 10")
+    
+    if include_details:
+        content.append("")
+        content.append("-" * 80)
+        content.append("DETAILED SCORES")
+        content.append("-" * 80)
+        content.append("")
+        
+        for i, score in enumerate(article['scores'], 1):
+            content.append(f"Score #{i}")
+            content.append(f"Timestamp: {score.get('timestamp', 'Unknown')}")
+            content.append("")
+            
+            for cat in categories:
+                content.append(f"  {cat.title():20s}: {score.get(cat, 0)} / 10")
+            
+            if include_notes and score.get('notes'):
+                content.append(f"\n  Notes: {score['notes']}")
+            
+            content.append("")
+    
+    return '\n'.join(content)
+
 @app.route('/api/export/txt', methods=['POST'])
 @login_required
 def export_txt():
-    """Export scored articles to text files"""
+    """Export scored articles to text files, streamed as a zip archive"""
     try:
         params = request.json
         score_range = params.get('scoreRange', 'All')
         include_details = params.get('includeDetails', True)
         include_notes = params.get('includeNotes', True)
         
-        scores_data = db.get_all_scores()
-        categories = ['accuracy', 'credibility', 'citation', 'reasoning', 'confidence']
-        
-        from io import BytesIO
-        import zipfile
+        # Range filtering and averages are computed in the database; articles
+        # are streamed from it one at a time
+        scored_articles = db.iter_scored_articles(score_range, include_scores=include_details)
         
-        zip_buffer = BytesIO()
-        
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            exported_count = 0
-            
-            for url, scores in scores_data.items():
-                if not scores:
-                    continue
-                
-                avg = sum(s.get(cat, 0) for s in scores for cat in categories) / (len(scores) * len(categories))
-                
-                if score_range != "All":
-                    if score_range == "9-10" and not (9 <= avg <= 10):
-                        continue
-                    elif score_range == "7-8" and not (7 <= avg <= 8):
-                        continue
-                    elif score_range == "4-6" and not (4 <= avg <= 6):
-                        continue
-                    elif score_range == "1-3" and not (1 <= avg <= 3):
-                        continue
-                
-                safe_url = "".join(c for c in url if c.isalnum() or c in (' ', '-', '_'))[:50]
-                filename = f"article_{exported_count + 1}_{safe_url}.txt"
-                
-                content = []
-                content.append("=" * 80)
-                content.append("ARTICLE SCORING REPORT")
-                content.append("=" * 80)
-                content.append("")
-                content.append(f"URL: {url}")
-                content.append("")
-                content.append(f"OVERALL AVERAGE SCORE: {avg:.2f} / 10")
-                content.append(f"NUMBER OF PEER SCORES: {len(scores)}")
-                content.append("")
-                
-                content.append("-" * 80)
-                content.append("CATEGORY AVERAGES")
-                content.append("-" * 80)
-                content.append("")
-                
-                for cat in categories:
-                    cat_scores = [s.get(cat, 0) for s in scores]
-                    cat_avg = sum(cat_scores) / len(cat_scores) if cat_scores else 0
-                    content.append(f"{cat.title():30s}: {cat_avg:.2f} / 10")
-                
-                if include_details:
-                    content.append("")
-                    content.append("-" * 80)
-                    content.append("DETAILED SCORES")
-                    content.append("-" * 80)
-                    content.append("")
-                    
-                    for i, score in enumerate(scores, 1):
-                        content.append(f"Score #{i}")
-                        content.append(f"Timestamp: {score.get('timestamp', 'Unknown')}")
-                        content.append("")
-                        
-                        for cat in categories:
-                            content.append(f"  {cat.title():20s}: {score.get(cat, 0)} / 10")
-                        
-                        if include_notes and score.get('notes'):
-                            content.append(f"\n  Notes: {score['notes']}")
-                        
-                        content.append("")
-                
-                zip_file.writestr(filename, '\n'.join(content))
-                exported_count += 1
-        
-        if exported_count == 0:
+        # Look at the first match up front so an empty export can still get a 400
+        first = next(scored_articles, None)
+        if first is None:
             return jsonify({'error': 'No articles match the selected criteria'}), 400
         
-        zip_buffer.seek(0)
+        def report_entries():
+            for number, article in enumerate(itertools.chain([first], scored_articles), 1):
+                safe_url = "".join(c for c in article['url'] if c.isalnum() or c in (' ', '-', '_'))[:50]
+                filename = f"article_{number}_{safe_url}.txt"
+                yield filename, render_article_report(article, include_details, include_notes)
         
-        return send_file(
-            zip_buffer,
+        download_name = f'article_scores_{datetime.now().strftime("%Y%m%d_%H%M%S")}.zip'
+        return Response(
+            stream_zip(report_entries()),
             mimetype='application/zip',
-            as_attachment=True,
-            download_name=f'article_scores_{datetime.now().strftime("%Y%m%d_%H%M%S")}.zip'
+            headers={'Content-Disposition': f'attachment; filename={download_name}'}
         )
     
     except Exception as e:
@@ -556,63 +771,62 @@ def export_txt():
 @app.route('/api/export/json', methods=['POST'])
 @login_required
 def export_json():
-    """Export scored articles to JSON file"""
+    """
+    Export scored articles as a streamed JSON document or NDJSON
+    
+    Body params:
+        scoreRange: Score range filter ('All', '9-10', ...)
+        format: 'json' (default) or 'ndjson' (one article per line)
+        gzip: Compress the download on the fly as a .gz file
+    """
     try:
         params = request.json
         score_range = params.get('scoreRange', 'All')
+        export_format = params.get('format', 'json')
+        compress = bool(params.get('gzip', False))
         
-        scores_data = db.get_all_scores()
-        categories = ['accuracy', 'credibility', 'citation', 'reasoning', 'confidence']
+        if export_format not in ('json', 'ndjson'):
+            return jsonify({'error': 'Unsupported format. Use json or ndjson'}), 400
         
-        export_data = {
-            'export_date': datetime.now().isoformat(),
-            'score_range_filter': score_range,
-            'articles': []
-        }
+        # Range filtering and averages are computed in the database; articles
+        # are streamed from it one at a time
+        scored_articles = db.iter_scored_articles(score_range, include_scores=True)
         
-        for url, scores in scores_data.items():
-            if not scores:
-                continue
-            
-            avg = sum(s.get(cat, 0) for s in scores for cat in categories) / (len(scores) * len(categories))
-            
-            if score_range != "All":
-                if score_range == "9-10" and not (9 <= avg <= 10):
-                    continue
-                elif score_range == "7-8" and not (7 <= avg <= 8):
-                    continue
-                elif score_range == "4-6" and not (4 <= avg <= 6):
-                    continue
-                elif score_range == "1-3" and not (1 <= avg <= 3):
-                    continue
-            
-            cat_avgs = {}
-            for cat in categories:
-                cat_scores = [s.get(cat, 0) for s in scores]
-                cat_avgs[cat] = sum(cat_scores) / len(cat_scores) if cat_scores else 0
-            
-            article_data = {
-                'url': url,
-                'overall_average': round(avg, 2),
-                'peer_scores_count': len(scores),
-                'category_averages': {k: round(v, 2) for k, v in cat_avgs.items()},
-                'individual_scores': scores
-            }
-            
-            export_data['articles'].append(article_data)
-        
-        if not export_data['articles']:
+        first = next(scored_articles, None)
+        if first is None:
             return jsonify({'error': 'No articles match the selected criteria'}), 400
         
-        json_buffer = io.BytesIO()
-        json_buffer.write(json.dumps(export_data, indent=2, ensure_ascii=False).encode('utf-8'))
-        json_buffer.seek(0)
-        
-        return send_file(
-            json_buffer,
-            mimetype='application/json',
-            as_attachment=True,
-            download_name=f'article_scores_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
+        def export_articles():
+            for article in itertools.chain([first], scored_articles):
+                yield {
+                    'url': article['url'],
+                    'overall_average': round(article['overall_average'], 2),
+                    'peer_scores_count': article['count'],
+                    'category_averages': {k: round(v, 2) for k, v in article['category_averages'].items()},
+                    'individual_scores': article['scores']
+                }
+        
+        if export_format == 'ndjson':
+            body = stream_ndjson(export_articles())
+            mimetype = 'application/x-ndjson'
+        else:
+            header = {
+                'export_date': datetime.now().isoformat(),
+                'score_range_filter': score_range
+            }
+            body = stream_json_document(header, 'articles', export_articles())
+            mimetype = 'application/json'
+        
+        download_name = f'article_scores_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{export_format}'
+        if compress:
+            body = stream_gzip(body)
+            mimetype = 'application/gzip'
+            download_name += '.gz'
+        
+        return Response(
+            body,
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename={download_name}'}
         )
     
     except Exception as e:
@@ -627,36 +841,14 @@ def export_urls():
         score_range = params.get('scoreRange', 'All')
         only_scored = params.get('onlyScored', False)
         
-        articles_list = db.get_all_articles()
-        scores_data = db.get_all_scores()
-        categories = ['accuracy', 'credibility', 'citation', 'reasoning', 'confidence']
-        
-        urls_to_export = []
-        
-        for article in articles_list:
-            url = article['URL']
-            scores = scores_data.get(url, [])
-            
-            # Filter by scored/unscored
-            if only_scored and not scores:
-                continue
-            
-            # Filter by score range
-            if scores and score_range != "All":
-                avg = sum(s.get(cat, 0) for s in scores for cat in categories) / (len(scores) * len(categories))
-                
-                if score_range == "9-10" and not (9 <= avg <= 10):
-                    continue
-                elif score_range == "7-8" and not (7 <= avg <= 8):
-                    continue
-                elif score_range == "4-6" and not (4 <= avg <= 6):
-                    continue
-                elif score_range == "1-3" and not (1 <= avg <= 3):
-                    continue
-            elif not scores and score_range != "All":
-                continue
-            
-            urls_to_export.append(url)
+        if score_range == "All" and not only_scored:
+            urls_to_export = [article['URL'] for article in db.get_all_articles()]
+        else:
+            # Only scored articles qualify; range filtering happens in the database
+            urls_to_export = [
+                article['url']
+                for article in db.get_scored_articles(score_range, newest_first=True)
+            ]
         
         if not urls_to_export:
             return jsonify({'error': 'No URLs match the selected criteria'}), 400